@@ -1,9 +1,79 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import numpy as np
-import sqlite3
+from data_layer import (load_home_runs, load_base_running, load_pitchers, find_player, cache_stats, store_memory_report,
+                        load_catalog, load_leaderboard_store, load_rank_engine, load_player_profile,
+                        load_chart_data, load_figure_cache, query_stats, pool_stats, load_player_search,
+                        load_leaderboard_search, load_profile_search)
+from plot_data import box_stats, box_traces
+
+#Type-ahead player picker: only the names matching what's typed are sent to the browser, not the whole list
+def pick_player(index, search_label, label, **kwargs):
+    query = st.sidebar.text_input(search_label, placeholder="Type part of a name")
+    matches = index.search(query)
+    #Nothing matches: say so and keep offering the first players
+    if not matches:
+        st.sidebar.caption(f"No players match '{query}'.")
+        matches = index.search('')
+    return st.sidebar.selectbox(label, matches, **kwargs)
+
+
+#Start and end (exclusive) of a slice of compare_count rows centered on selected_index, kept inside 0..total
+def peer_window(selected_index, compare_count, total):
+    #Divide the compare count by two for calculations
+    half = compare_count // 2
+
+    #Calculate start and end index for slicing (trying to center selected player on the bar graph)
+    start = selected_index - half
+    #+1 because slicing is exclusive on end
+    end = selected_index + half + 1
+
+    #Adjust if out of bounds (too little players on one side due to rank)
+    #Check to see if the starting index for the comparison slice is LESS than 0
+    if start < 0:
+        #If the starting index  is less than 0, add how many it is off by its opposite (e.g. if it's -1, add +1) to the end to maintain balance
+        end += abs(start)
+        #Reset start to 0
+        start = 0
+    #If the last one goes beyond the boundaries of len, have the end be the last entry
+    if end > total:
+        #If the end is greater than len, calculate the difference and subtract that value from start
+        start -= (end - total)
+        #Have end be the same as the last valid index in the dataframe 
+        end = total
+        #If start is less than 0 and end is still greater than the last valid index in the dataframe
+        if start < 0:
+            #Have start be reset to 0
+            start = 0
+    return start, end
+
+
+#Mark a player's value on a box plot: a red legend entry and an arrow at the value
+def highlight_box(fig, player_name, value):
+    #Make an invisible dot for the legend, but no dot will be placed on the actual plot
+    fig.add_trace(go.Scatter(
+        x=[None], 
+        y=[None],
+        mode='markers',
+        marker=dict(color='red', size=12),
+        name=player_name,
+    ))
+    #Add an arrow pointing to player's stat on the boxplot
+    fig.add_annotation(
+        x=0,
+        y=value,
+        text="", 
+        showarrow=True,
+        arrowhead=2,
+        ax=40,
+        ay=-20,
+        arrowcolor='red',
+        font=dict(color="red", size=18)
+    )
+    return fig
+
 
 # Set global font size
 st.markdown("""
@@ -18,441 +88,564 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-#Connect to the database
-conn = sqlite3.connect('mlb_hit_pitch_stats.db')
-
 #Title of the Streamlit
 st.title("⚾️⚾️ MLB Player Stats ⚾️⚾️")
 
 # Player type selector
-player_type = st.sidebar.radio("Select Player Type", ["Hitter", "Pitcher"])
+player_type = st.sidebar.radio("Select Player Type", ["Hitter", "Pitcher", "Leaderboard Explorer", "Player Profile"])
+
+#Each chart section is a fragment: changing one of its widgets reruns just that section (st.fragment, or
+#st.experimental_fragment on older Streamlit); without either, sections run as plain functions with the page
+fragment = getattr(st, 'fragment', None) or getattr(st, 'experimental_fragment', None) or (lambda func: func)
+
+#Fast charts: WebGL scatters and box plots drawn from precomputed quartiles and outliers (not every value)
+fast_charts = st.sidebar.toggle("Fast charts (WebGL)", value=True)
+scatter = go.Scattergl if fast_charts else go.Scatter
+#Box statistics and hover labels, computed once per data version
+chart_data = load_chart_data()
+#Figures already built for a chart and its inputs (base "all players" figures too), until the data changes
+figures = load_figure_cache()
+
+#Show how often the shared data cache was able to skip the database
+with st.sidebar.expander("Data cache"):
+    st.write(cache_stats())
+    st.dataframe(store_memory_report(), hide_index=True)
+    st.write(figures.stats())
+    #Recent queries with their timings (slow ones are also written to the slow query log)
+    st.dataframe(query_stats(), hide_index=True)
+    #The pool of read-only connections: how many are checked out, idle, opened and reused
+    if pool_stats() is not None:
+        st.write(pool_stats())
 
 ########################################################################
 #1st Chart - Home Runs (Hitter Section)
 if player_type == "Hitter":
-    #Grab the information (name and amount of home runs) from the dataframe in the database
-    def load_home_runs():
-        df = pd.read_sql('SELECT name, home_runs FROM "mlb_home_runs_all_time_top_1,000_leaders"', conn)
-        df['name'] = df['name'].str.title()
-        #Descending order; Drop na values (just in case they failed to drop in the cleaning)
-        df = df.dropna().sort_values(by='home_runs', ascending=False).reset_index(drop=True)
-        df['rank'] = df.index + 1
-        return df
-
-    #Load the homeruns dataframe from the mlb_hit_pitch_stats.db
+    #Load the homeruns dataframe (cached across reruns and sessions until mlb_hit_pitch_stats.db changes)
     df = load_home_runs()
 
     #Player selection in the side bar
     st.sidebar.header("Player Selection")
-    selected_player = st.sidebar.selectbox("Choose a player", df['name'])
-
-    #Get the row index of the selected player in the dataframe
-    selected_index = df[df['name'] == selected_player].index[0]
-
-    #Title the section
-    st.header("Home Run Comparison")
-    #The total number of players are the number of unique players in the dataframe from mlb_hit_pitch_stats.db
-    total_number_of_players = len(df)
-    st.markdown(f"**{selected_player}** ranks **#{int(df.loc[selected_index, 'rank'])}** out of **{total_number_of_players}** players (all time).")
-
-    #Slider for comparisons
-    st.subheader(f"How many players should {selected_player} be compared against?")
-    compare_count = st.slider("Number of players to compare (odd number)", 3, 19, step=2, value=9)
-    #Divide the compare count by two for calculations
-    half = compare_count // 2
-
-    #Calculate start and end index for slicing (trying to center selected player on the bar graph)
-    start = selected_index - half
-    #+1 because slicing is exclusive on end
-    end = selected_index + half + 1
+    selected_player = pick_player(load_player_search('hitters'), "Search hitters", "Choose a player")
+
+    #Get the row index of the selected player in the dataframe (from the name index built once per dataset)
+    selected_index = find_player('hitters', selected_player)
+    #The selected player's row, reused by every chart below
+    player_data = df.iloc[selected_index]
+
+    #Home run comparison section: moving the slider reruns only this, not the charts below
+    @fragment
+    def home_run_comparison(df, selected_player, selected_index, player_data):
+        #Title the section
+        st.header("Home Run Comparison")
+        #The total number of players are the number of unique players in the dataframe from mlb_hit_pitch_stats.db
+        total_number_of_players = len(df)
+        st.markdown(f"**{selected_player}** ranks **#{int(player_data['rank'])}** out of **{total_number_of_players}** players (all time).")
+
+        #Slider for comparisons
+        st.subheader(f"How many players should {selected_player} be compared against?")
+        compare_count = st.slider("Number of players to compare (odd number)", 3, 19, step=2, value=9)
+        #Slice of rows to compare, centered on the selected player where possible
+        start, end = peer_window(selected_index, compare_count, len(df))
+
+        #Build the bar chart only the first time this player / slider combination is shown
+        def build_home_run_bar():
+            #Create a subset dataframe of players to compare including the selected player, and mark the selected player
+            subset = df.iloc[start:end].copy()
+            subset['highlight'] = [pos == selected_index for pos in range(start, end)]
+
+            #Plot
+            fig_bar = px.bar(
+                subset,
+                x='home_runs',
+                y='name',
+                color='highlight',
+                #Chosen player = Red, All other player = white
+                color_discrete_map={True: 'red', False: 'white'},
+                labels={'home_runs': 'Home Runs', 'name': 'Player'},
+                title=f"Home Runs: {selected_player} vs Peers",
+                orientation='h',
+                hover_data={
+                    'home_runs': True,
+                    'rank': True,
+                    'name': False,
+                    'highlight': False
+                }
+            )
 
-    #Adjust if out of bounds (too little players on one side due to rank)
-    #Check to see if the starting index for the comparison slice is LESS than 0
-    if start < 0:
-        #If the starting index  is less than 0, add how many it is off by its opposite (e.g. if it's -1, add +1) to the end to maintain balance
-        end += abs(start)
-        #Reset start to 0
-        start = 0
-    #If the last one goes beyond the boundaries of len, have the end be the last entry
-    if end > len(df):
-        #If the end is greater than len, calculate the difference and subtract that value from start
-        start -= (end - len(df))
-        #Have end be the same as the last valid index in the dataframe 
-        end = len(df)
-        #If start is less than 0 and end is still greater than the last valid index in the dataframe
-        if start < 0:
-            #Have start be reset to 0
-            start = 0
+            #Home Run Bar Plot Deco
+            fig_bar.update_layout(
+                yaxis=dict(
+                    categoryorder='array',
+                    categoryarray=subset['name'].tolist()[::-1],
+                    tickfont=dict(color='black')  
+                ),
+                xaxis=dict(tickfont=dict(color='black')),  
+                showlegend=False,
+                title_font=dict(size=18, color='black'),         
+                yaxis_title_font=dict(size=18, color='black'),   
+                xaxis_title_font=dict(size=18, color='black'),  
+                font=dict(size=18, color='black'),               
+                plot_bgcolor='#D9AC30',
+                paper_bgcolor='#D9AC30',
+                legend=dict(font=dict(color='black'))
+            )
+            return fig_bar
 
-    #Create a subset dataframe of players to compare including the selected player, and mark the selected player
-    subset = df.iloc[start:end].copy()
-    subset['highlight'] = subset['name'] == selected_player
-
-    #Plot
-    fig_bar = px.bar(
-        subset,
-        x='home_runs',
-        y='name',
-        color='highlight',
-        #Chosen player = Red, All other player = white
-        color_discrete_map={True: 'red', False: 'white'},
-        labels={'home_runs': 'Home Runs', 'name': 'Player'},
-        title=f"Home Runs: {selected_player} vs Peers",
-        orientation='h',
-        hover_data={
-            'home_runs': True,
-            'rank': True,
-            'name': False,
-            'highlight': False
-        }
-    )
+        fig_bar = figures.get(('home_run_bar', selected_player, compare_count), build_home_run_bar)
 
-    #Home Run Bar Plot Deco
-    fig_bar.update_layout(
-        yaxis=dict(
-            categoryorder='array',
-            categoryarray=subset['name'].tolist()[::-1],
-            tickfont=dict(color='black')  
-        ),
-        xaxis=dict(tickfont=dict(color='black')),  
-        showlegend=False,
-        title_font=dict(size=18, color='black'),         
-        yaxis_title_font=dict(size=18, color='black'),   
-        xaxis_title_font=dict(size=18, color='black'),  
-        font=dict(size=18, color='black'),               
-        plot_bgcolor='#D9AC30',
-        paper_bgcolor='#D9AC30',
-        legend=dict(font=dict(color='black'))
-    )
+        #Display the bar chart
+        st.plotly_chart(fig_bar, use_container_width=True)
 
-    #Display the bar chart
-    st.plotly_chart(fig_bar, use_container_width=True)
+    home_run_comparison(df, selected_player, selected_index, player_data)
 
  ####2ND CHART Homerun Boxplot
-    #Initializes an empty Plotly Figure
-    fig_home_run_box = go.Figure()
-
-    #Plot
-    fig_home_run_box.add_trace(go.Box(
-        y=df['home_runs'],
-        boxpoints='outliers',
-        name='All Players',
-        marker_color='white',  
-        hoverinfo='skip' 
-    ))
+    #Home run distribution section (reruns on its own)
+    @fragment
+    def home_run_distribution(df, selected_player, player_data):
+        #Every player's box and the styling, built once per data version
+        def build_home_run_box():
+            #Initializes an empty Plotly Figure
+            fig_home_run_box = go.Figure()
+
+            #Plot (only the box's summary numbers and its outliers go to the browser in fast mode)
+            if fast_charts:
+                fig_home_run_box.add_traces(box_traces(chart_data['home_run_box'], 'All Players'))
+            else:
+                fig_home_run_box.add_trace(go.Box(
+                    y=df['home_runs'],
+                    boxpoints='outliers',
+                    name='All Players',
+                    marker_color='white',  
+                    hoverinfo='skip' 
+                ))
+
+            fig_home_run_box.update_layout(
+                title="Home Runs Distribution",
+                yaxis_title="Home Runs",
+                showlegend=True,
+                xaxis=dict(showticklabels=False),
+                yaxis=dict(tickfont=dict(color='black')),
+                title_font=dict(size=18, color='black'),
+                yaxis_title_font=dict(size=18, color='black'),
+                font=dict(size=18, color='black'),
+                plot_bgcolor='#D9AC30',
+                paper_bgcolor='#D9AC30',
+                legend=dict(font=dict(color='black')),
+            )
+            return fig_home_run_box
 
-    #Selected player's home run stat
-    player_stat = df.loc[df['name'] == selected_player, 'home_runs'].values[0]
+        #Selected player's home run stat
+        player_stat = player_data['home_runs']
 
-    #Calculate percentile of the chosen player
-    percentile = np.round(100 * (df['home_runs'] < player_stat).mean(), 1)
+        #Percentile of the chosen player (precomputed by the loader)
+        percentile = player_data['home_run_percentile']
 
-    #Make an invisible dot for the legend, but no dot will be placed on the actual plot
-    fig_home_run_box.add_trace(go.Scatter(
-        x=[None], 
-        y=[None],
-        mode='markers',
-        marker=dict(color='red', size=12),
-        name=selected_player,
-    ))
+        #The cached base box with the selected player overlaid
+        fig_home_run_box = figures.get(
+            ('home_run_box', fast_charts, selected_player),
+            lambda: highlight_box(figures.get(('home_run_box', fast_charts), build_home_run_box), selected_player, player_stat),
+        )
 
-    #Add an arrow pointing to player's stat on the boxplot
-    fig_home_run_box.update_layout(
-        title="Home Runs Distribution",
-        yaxis_title="Home Runs",
-        showlegend=True,
-        xaxis=dict(showticklabels=False),
-        yaxis=dict(tickfont=dict(color='black')),
-        title_font=dict(size=18, color='black'),
-        yaxis_title_font=dict(size=18, color='black'),
-        font=dict(size=18, color='black'),
-        plot_bgcolor='#D9AC30',
-        paper_bgcolor='#D9AC30',
-        legend=dict(font=dict(color='black')),
-        annotations=[
-            dict(
-                x=0,
-                y=player_stat,
-                text="", 
-                showarrow=True,
-                arrowhead=2,
-                ax=40,
-                ay=-20,
-                arrowcolor='red',
-                font=dict(color="red", size=18)
+        #Title of the section
+        st.header("Home Runs Distribution")
+        st.markdown(f"**{selected_player}** is at the **{percentile}th percentile** of all-time home run hitters.")
+
+        #Display the boxplot chart
+        st.plotly_chart(fig_home_run_box, use_container_width=True)
+
+    home_run_distribution(df, selected_player, player_data)
+
+    #Base running section (reruns on its own)
+    @fragment
+    def base_running(selected_player, player_data):
+        ###3RD CHART - Stolen bases vs Caught
+        #Load the merged stolen base and caught stealing data (with success rate)
+        merged_df = load_base_running()
+
+        #Every player's dot and the styling, built once per data version
+        def build_sb_cs():
+            ##Initializes an empty Plotly Figure
+            fig_sb_cs = go.Figure()
+
+            #Plot the players as dots
+            fig_sb_cs.add_trace(scatter(
+                x=merged_df['sb'],
+                y=merged_df['cs'],
+                mode='markers',
+                marker=dict(color='white', size=8),  
+                name='All Players',
+                hoverinfo='text',
+                #Hover labels are built once per data version, not per rerun
+                hovertext=chart_data['base_running_hover'],
+            ))
+
+            #Plot information
+            fig_sb_cs.update_layout(
+                title=f"Bases Caught Stealing vs Bases Stolen",
+                xaxis_title='Stolen Bases',
+                yaxis_title='Caught Stealing',
+                showlegend=True,
+                title_font=dict(size=18, color='black'),
+                xaxis_title_font=dict(size=18, color='black'),
+                yaxis_title_font=dict(size=18, color='black'),
+                font=dict(size=18, color='black'),
+                plot_bgcolor='#D9AC30',
+                paper_bgcolor='#D9AC30',
+                legend=dict(font=dict(color='black')),
+                xaxis=dict(tickfont=dict(color='black')),
+                yaxis=dict(tickfont=dict(color='black'))
             )
-        ],
-    )
-
-    #Title of the section
-    st.header("Home Runs Distribution")
-    st.markdown(f"**{selected_player}** is at the **{percentile}th percentile** of all-time home run hitters.")
-    
-    #Display the boxplot chart
-    st.plotly_chart(fig_home_run_box, use_container_width=True)
-
-    ###3RD CHART - Stolen bases vs Caught
-    #Load stolen bases and caught stealing from two tables and merge on name
-    def load_base_running():
-        #Grab information and shorthand names
-        df_stolen = pd.read_sql('SELECT name, stolen_bases AS sb FROM stolen_bases_all_time_leaders_on_baseball_almanac', conn)
-        df_caught = pd.read_sql('SELECT name, caught_stealing AS cs FROM caught_stealing_all_time_leaders_on_baseball_almanac', conn)
-        #Strip names of unnecessary white space
-        df_stolen['name'] = df_stolen['name'].str.title().str.strip()
-        df_caught['name'] = df_caught['name'].str.title().str.strip()
-        #Make sure the numerical numbers are numeric (double-check for safety)
-        df_stolen['sb'] = pd.to_numeric(df_stolen['sb'], errors='coerce')
-        df_caught['cs'] = pd.to_numeric(df_caught['cs'], errors='coerce')
-        #Inner merge on name for the stolen_bases and caught_stealing tables in the database
-        df = pd.merge(df_stolen, df_caught, on='name', how='inner').dropna()
-        #Return the new dataframe
-        return df
-
-    #Load and prepare base running data (the dataframe we just made)
-    merged_df = load_base_running()
-
-    ##Initializes an empty Plotly Figure
-    fig_sb_cs = go.Figure()
-
-    #Plot the players as dots
-    fig_sb_cs.add_trace(go.Scatter(
-        x=merged_df['sb'],
-        y=merged_df['cs'],
-        mode='markers',
-        marker=dict(color='white', size=8),  
-        name='All Players',
-        hoverinfo='text',
-        hovertext=[
-        f"{name}<br>Bases stolen: {bs}<br>Times caught stealing: {cs}"
-        for name, bs, cs in zip(merged_df['name'], merged_df['sb'], merged_df['cs'])
-        ],
-    ))
-
-        #Highlight the selected player in red
-    if selected_player in merged_df['name'].values:
-        selected_stats = merged_df[merged_df['name'] == selected_player]
-        fig_sb_cs.add_trace(go.Scatter(
-            x=selected_stats['sb'],
-            y=selected_stats['cs'],
-            mode='markers',
-            marker=dict(color='red', size=8),
-            name=selected_player,
-            hoverinfo='text',
-            hovertext=[
-                f"{selected_player}<br>Bases stolen: {selected_stats['sb'].values[0]}<br>Times caught stealing: {selected_stats['cs'].values[0]}"
-            ]
-
-        ))
-
-    #Plot information
-    fig_sb_cs.update_layout(
-        title=f"Bases Caught Stealing vs Bases Stolen",
-        xaxis_title='Stolen Bases',
-        yaxis_title='Caught Stealing',
-        showlegend=True,
-        title_font=dict(size=18, color='black'),
-        xaxis_title_font=dict(size=18, color='black'),
-        yaxis_title_font=dict(size=18, color='black'),
-        font=dict(size=18, color='black'),
-        plot_bgcolor='#D9AC30',
-        paper_bgcolor='#D9AC30',
-        legend=dict(font=dict(color='black')),
-        xaxis=dict(tickfont=dict(color='black')),
-        yaxis=dict(tickfont=dict(color='black'))
-    )
-
-    #Title of the section
-    st.header("Base Running: Bases Caught Stealing vs Bases Stolen")
-
-    #Calculate and display stolen base success rate and rank (based on calculations)
-    if selected_player in merged_df['name'].values:
-        #Extract the selected player's data row
-        player_data = merged_df[merged_df['name'] == selected_player].iloc[0]
-        #Player's stolen bases
-        sb = player_data['sb']
-        #Number of times the player was caught stealing
-        cs = player_data['cs']
-        #Total attempts is successful steals + unsuccessful steals
-        total_attempts = sb + cs
-        #If attempts are greater than 0
-        if total_attempts > 0:
-            #Calculate success rate percentage
-            success_rate = round(100 * sb / total_attempts, 1)
-        #Otherwise the success rate is 0
+            return fig_sb_cs
+
+        #Highlight the selected player in red on top of the cached base figure
+        def highlight_sb_cs():
+            fig_sb_cs = figures.get(('sb_cs', fast_charts), build_sb_cs)
+            base_running_index = find_player('base_running', selected_player)
+            if base_running_index is not None:
+                selected_stats = merged_df.iloc[base_running_index]
+                fig_sb_cs.add_trace(scatter(
+                    x=[selected_stats['sb']],
+                    y=[selected_stats['cs']],
+                    mode='markers',
+                    marker=dict(color='red', size=8),
+                    name=selected_player,
+                    hoverinfo='text',
+                    hovertext=[
+                        f"{selected_player}<br>Bases stolen: {selected_stats['sb']}<br>Times caught stealing: {selected_stats['cs']}"
+                    ]
+
+                ))
+            return fig_sb_cs
+
+        fig_sb_cs = figures.get(('sb_cs', fast_charts, selected_player), highlight_sb_cs)
+
+        #Title of the section
+        st.header("Base Running: Bases Caught Stealing vs Bases Stolen")
+
+        #Display stolen base success rate and rank (precomputed by the loader on the selected player's row)
+        if pd.notna(player_data['success_rate_rank']):
+            #Player's stolen bases
+            sb = int(player_data['sb'])
+            #Number of times the player was caught stealing
+            cs = int(player_data['cs'])
+            #Success rate percentage
+            success_rate = player_data['success_rate_percent']
+            #Rank of the selected player by success rate (1-based)
+            player_rank = int(player_data['success_rate_rank'])
+            #The total number of players is the length of the merged dataframe
+            total_number_of_players = len(merged_df)
+            #Display the player's stolen base stats and success rate rank
+            st.markdown(
+                f"**{selected_player}** successfully stole **{sb}** bases and was caught **{cs}** times.\n\n"
+                f"They have a stolen base success rate of **{success_rate}%**, ranking **#{player_rank}** out of {total_number_of_players} players."
+            )
+        #If selected player doesn't exist in the dataframe
         else:
-            success_rate = 0
-        #Create a new column in the merged dataframe for the success rate
-        merged_df['success_rate'] = merged_df['sb'] / (merged_df['sb'] + merged_df['cs'])
-        #If the value is NaN, fill it with 0
-        merged_df['success_rate'] = merged_df['success_rate'].fillna(0)
-        #Sort the dataframe by success rate in descending order and reset index
-        merged_df = merged_df.sort_values(by='success_rate', ascending=False).reset_index(drop=True)
-        #Get the rank of the selected player by success rate (1-based)
-        player_rank = merged_df.index[merged_df['name'] == selected_player].tolist()[0] + 1
-        #The total number of players is the length of the merged dataframe
-        total_number_of_players = len(merged_df)
-        #Display the player's stolen base stats and success rate rank
-        st.markdown(
-            f"**{selected_player}** successfully stole **{sb}** bases and was caught **{cs}** times.\n\n"
-            f"They have a stolen base success rate of **{success_rate}%**, ranking **#{player_rank}** out of {total_number_of_players} players."
-        )
-    #If selected player doesn't exist in the dataframe
-    else:
-        #Display a warning if there's no data for the selected player
-        st.markdown(f"Sorry! There is no stolen base or caught stealing data available for **{selected_player}**.")
+            #Display a warning if there's no data for the selected player
+            st.markdown(f"Sorry! There is no stolen base or caught stealing data available for **{selected_player}**.")
 
-    #Plot
-    st.plotly_chart(fig_sb_cs, use_container_width=True)
+        #Plot
+        st.plotly_chart(fig_sb_cs, use_container_width=True)
+
+    base_running(selected_player, player_data)
 
 #####################################################################################################################
 ####CHART 4 -  Games Saved vs Games Pitched
 elif player_type == "Pitcher":
-    #Load saves and games pitched
-    df_saves = pd.read_sql('SELECT name, games AS saves FROM saves_all_time_leaders', conn)
-    df_games_pitched = pd.read_sql('SELECT name, games AS games_pitched FROM games_pitched_all_time_leaders', conn)
+    #Load saves, games pitched and ERA (only pitchers with all three; cached until the database changes)
+    df_pitchers = load_pitchers()
 
-    #Clean and merge
-    df_eff = df_saves.merge(df_games_pitched, on='name')
-    #Double check for nuemrical comaptibility
-    df_eff[['saves', 'games_pitched']] = df_eff[['saves', 'games_pitched']].apply(pd.to_numeric, errors='coerce')
+    #Single pitcher selector sidebar - only names in BOTH data sets (from the merge from before)
+    st.sidebar.header("Player Selection")
+    selected_player = pick_player(load_player_search('pitchers'), "Search pitchers", "Choose a pitcher")
 
-    #Load ERA data
-    df_era = pd.read_sql('SELECT name, era FROM earned_run_average_all_time_leaders', conn)
+    #The selected pitcher's row (from the name index built once per dataset), reused by every chart below
+    player_row = df_pitchers.iloc[find_player('pitchers', selected_player)]
 
-    #Merge df_eff and df_era to get only pitchers with BOTH data
-    df_pitchers = df_eff.merge(df_era, on='name')
+    #Saves section (reruns on its own)
+    @fragment
+    def save_comparison(df_pitchers, selected_player, player_row):
+        #Name the chart
+        st.header("Games Saved vs Games Pitched")
 
-    #Single pitcher selector sidebar - only names in BOTH data sets (from the merge from before)
-    st.sidebar.header("Player Selection")
-    selected_player = st.sidebar.selectbox("Choose a pitcher", df_pitchers['name'].sort_values())
-
-    #Name the chart
-    st.header("Games Saved vs Games Pitched")
-
-    #Calculate save percentage
-    df_pitchers['save_percentage'] = (df_pitchers['saves'] / df_pitchers['games_pitched']) * 100
-
-    #Display percentile and save percentage message
-    #Get the selected player's save percentage from pitchers df
-    player_save_pct = df_pitchers.loc[df_pitchers['name'] == selected_player, 'save_percentage'].values[0]
-    #Calculate rank based on save_percentage descending (1.0 is highest save %)
-    df_pitchers_sorted = df_pitchers.sort_values(by='save_percentage', ascending=False).reset_index(drop=True)
-    #Attach a rank column based on the sorted index
-    df_pitchers_sorted['rank'] = df_pitchers_sorted.index + 1
-    #Get the player's rank from the sorted pitchers df based on their name
-    player_rank = df_pitchers_sorted.loc[df_pitchers_sorted['name'] == selected_player, 'rank'].values[0]
-    #Total players from the new sorted pitcher dataframe
-    total_players = len(df_pitchers_sorted)
-
-    st.markdown(
-        f"**{selected_player}** saved **{player_save_pct:.1f}%** of games they pitched in, "
-        f"ranking at **#{int(player_rank)}** out of **{total_players}** players."
-    )
+        #Display percentile and save percentage message
+        #Get the selected player's save percentage from pitchers df
+        player_save_pct = player_row['save_percentage']
+        #Rank based on save_percentage descending (precomputed by the loader; 1 is highest save %)
+        player_rank = player_row['save_percentage_rank']
+        #Total players in the pitcher dataframe
+        total_players = len(df_pitchers)
 
-    #Initializes an empty Plotly Figure
-    fig_save_caught = go.Figure()
+        st.markdown(
+            f"**{selected_player}** saved **{player_save_pct:.1f}%** of games they pitched in, "
+            f"ranking at **#{int(player_rank)}** out of **{total_players}** players."
+        )
 
-    #All players scatterplot
-    fig_save_caught.add_trace(go.Scatter(
-        x=df_pitchers['games_pitched'],
-        y=df_pitchers['saves'],
-        mode='markers',
-        marker=dict(color='white', size=8), 
-        name='All Players',
-        hoverinfo='text',
-        text=[
-        f"{name}<br>Games Pitched: {gp}<br>Games Saved: {sv}"
-        for name, gp, sv in zip(df_pitchers['name'], df_pitchers['games_pitched'], df_pitchers['saves'])
-        ]
-    ))
+        #Every pitcher's dot and the styling, built once per data version
+        def build_save_caught():
+            #Initializes an empty Plotly Figure
+            fig_save_caught = go.Figure()
+
+            #All players scatterplot
+            fig_save_caught.add_trace(scatter(
+                x=df_pitchers['games_pitched'],
+                y=df_pitchers['saves'],
+                mode='markers',
+                marker=dict(color='white', size=8), 
+                name='All Players',
+                hoverinfo='text',
+                #Hover labels are built once per data version, not per rerun
+                text=chart_data['pitcher_hover'],
+            ))
+
+            #Deco
+            fig_save_caught.update_layout(
+                xaxis_title='Games Pitched',
+                yaxis_title='Games Saved',
+                title='Games Saved vs Games Pitched',
+                showlegend=True,
+                title_font=dict(size=18, color='black'),
+                xaxis_title_font=dict(size=18, color='black'),
+                yaxis_title_font=dict(size=18, color='black'),
+                font=dict(size=18, color='black'),
+                plot_bgcolor='#D9AC30',
+                paper_bgcolor='#D9AC30',
+                legend=dict(font=dict(color='black')),
+                xaxis=dict(tickfont=dict(color='black')),
+                yaxis=dict(tickfont=dict(color='black'))
+            )
+            return fig_save_caught
 
-    # Highlight selected player
-    player_row = df_pitchers[df_pitchers['name'] == selected_player].iloc[0]
-    fig_save_caught.add_trace(go.Scatter(
-        x=[player_row['games_pitched']],
-        y=[player_row['saves']],
-        mode='markers',
-        marker=dict(color='red', size=8),
-        textposition='top center',
-        name=selected_player,
-        hoverinfo='text',
-        text=[f"{selected_player}<br>Games Pitched: {player_row['games_pitched']}<br>Games Saved: {player_row['saves']}"],
-    ))
+        # Highlight selected player on top of the cached base figure
+        def highlight_save_caught():
+            fig_save_caught = figures.get(('save_caught', fast_charts), build_save_caught)
+            fig_save_caught.add_trace(scatter(
+                x=[player_row['games_pitched']],
+                y=[player_row['saves']],
+                mode='markers',
+                marker=dict(color='red', size=8),
+                textposition='top center',
+                name=selected_player,
+                hoverinfo='text',
+                text=[f"{selected_player}<br>Games Pitched: {player_row['games_pitched']}<br>Games Saved: {player_row['saves']}"],
+            ))
+            return fig_save_caught
 
-    #Deco
-    fig_save_caught.update_layout(
-        xaxis_title='Games Pitched',
-        yaxis_title='Games Saved',
-        title='Games Saved vs Games Pitched',
-        showlegend=True,
-        title_font=dict(size=18, color='black'),
-        xaxis_title_font=dict(size=18, color='black'),
-        yaxis_title_font=dict(size=18, color='black'),
-        font=dict(size=18, color='black'),
-        plot_bgcolor='#D9AC30',
-        paper_bgcolor='#D9AC30',
-        legend=dict(font=dict(color='black')),
-        xaxis=dict(tickfont=dict(color='black')),
-        yaxis=dict(tickfont=dict(color='black'))
-    )
+        fig_save_caught = figures.get(('save_caught', fast_charts, selected_player), highlight_save_caught)
 
-    st.plotly_chart(fig_save_caught, use_container_width=True)
+        st.plotly_chart(fig_save_caught, use_container_width=True)
 
+    save_comparison(df_pitchers, selected_player, player_row)
 
 #### Chart 5: ERA Distribution ####
-    st.header("Earned Run Average (ERA) Distribution")
+    #ERA section (reruns on its own)
+    @fragment
+    def era_distribution(df_pitchers, selected_player, player_row):
+        st.header("Earned Run Average (ERA) Distribution")
+
+        #Every pitcher's box and the styling, built once per data version
+        def build_era_box():
+            #Initializes an empty Plotly Figure
+            fig_era_box = go.Figure()
+
+            if fast_charts:
+                fig_era_box.add_traces(box_traces(chart_data['era_box'], 'All Pitchers'))
+            else:
+                fig_era_box.add_trace(go.Box(
+                    y=df_pitchers['era'],
+                    boxpoints='outliers',
+                    name='All Pitchers',
+                    marker_color='white', 
+                    hoverinfo='skip'
+                ))
+
+            #Deco
+            fig_era_box.update_layout(
+                title="ERA Distribution",
+                yaxis_title="ERA",
+                showlegend=True,
+                xaxis=dict(showticklabels=False),
+                yaxis=dict(tickfont=dict(color='black')),
+                title_font=dict(size=18, color='black'),
+                yaxis_title_font=dict(size=18, color='black'),
+                font=dict(size=18, color='black'),
+                plot_bgcolor='#D9AC30',
+                paper_bgcolor='#D9AC30',
+                legend=dict(font=dict(color='black')),
+            )
+            return fig_era_box
 
-    #Initializes an empty Plotly Figure
-    fig_era_box = go.Figure()
+        #Get the ERA value for the selected player
+        era_stat = player_row['era']
+        #Percentile of the player based on their ERA (precomputed by the loader)
+        percentile = player_row['era_percentile']
 
-    fig_era_box.add_trace(go.Box(
-        y=df_pitchers['era'],
-        boxpoints='outliers',
-        name='All Pitchers',
-        marker_color='white', 
-        hoverinfo='skip'
-    ))
+        #The cached base box with the selected player overlaid
+        fig_era_box = figures.get(
+            ('era_box', fast_charts, selected_player),
+            lambda: highlight_box(figures.get(('era_box', fast_charts), build_era_box), selected_player, era_stat),
+        )
 
-    #Get the ERA value for the selected player
-    era_stat = df_pitchers.loc[df_pitchers['name'] == selected_player, 'era'].values[0]
-    #Calculate the percentile of the player based on their ERA
-    percentile = np.round(100 * (df_pitchers['era'] > era_stat).mean(), 1)
+        st.markdown(f"**{selected_player}** has an ERA of **{era_stat:.2f}** (lower ERA is better), placing them in the **{percentile}th percentile**.")
+        st.plotly_chart(fig_era_box, use_container_width=True)
 
-    #Selected player in the legend
-    fig_era_box.add_trace(go.Scatter(
-        x=[None], y=[None],
-        mode='markers',
-        marker=dict(color='red', size=12),
-        name=selected_player,
-    ))
+    era_distribution(df_pitchers, selected_player, player_row)
 
-    #Deco
-    fig_era_box.update_layout(
-        title="ERA Distribution",
-        yaxis_title="ERA",
-        showlegend=True,
-        xaxis=dict(showticklabels=False),
-        yaxis=dict(tickfont=dict(color='black')),
-        title_font=dict(size=18, color='black'),
-        yaxis_title_font=dict(size=18, color='black'),
-        font=dict(size=18, color='black'),
-        plot_bgcolor='#D9AC30',
-        paper_bgcolor='#D9AC30',
-        legend=dict(font=dict(color='black')),
-        annotations=[
-            dict(
-                x=0,
-                y=era_stat,
-                text="",
-                showarrow=True,
-                arrowhead=2,
-                ax=40,
-                ay=-20,
-                arrowcolor='red',
-                font=dict(color="red", size=18)
+#####################################################################################################################
+####Leaderboard Explorer - any stat of any of the scraped leaderboards
+elif player_type == "Leaderboard Explorer":
+    #Tables and columns come from the schema catalog (read once, then cached with the data)
+    catalog = load_catalog()
+
+    st.sidebar.header("Leaderboard Selection")
+    table = st.sidebar.selectbox("Choose a leaderboard", catalog.leaderboards(), format_func=catalog.label)
+    stat_columns = catalog.stat_columns(table)
+    stat = st.sidebar.selectbox("Choose a stat", stat_columns, index=stat_columns.index(catalog.primary_stat(table)))
+    stat_label = stat.replace('_', ' ').title()
+
+    #The leaderboard with its own name index, and the stat sorted once for ranks, percentiles and peers
+    store = load_leaderboard_store(table)
+    df_board = store.table(table)
+    metric = load_rank_engine().metric(table, stat)
+    primary = stat == catalog.primary_stat(table)
+    if primary:
+        #The leaderboard's own rank says which way is better for the stat it's ranked by (e.g. a low ERA ranks first)
+        first, last = df_board['rank'].idxmin(), df_board['rank'].idxmax()
+        higher_is_better = bool(df_board.loc[first, stat] >= df_board.loc[last, stat])
+    else:
+        #Other columns (e.g. the raw counts behind a rate) have no rank to go by, so higher is better unless the user says otherwise
+        higher_is_better = st.sidebar.toggle("Higher is better", value=True,
+                                             help=f"Which way {stat_label.lower()} is ranked (the leaderboard is ranked by "
+                                                  f"{catalog.primary_stat(table).replace('_', ' ')}, not this stat)")
+
+    st.sidebar.header("Player Selection")
+    selected_player = pick_player(load_leaderboard_search(table), "Search players", "Choose a player")
+    player_row = df_board.iloc[store.position(table, selected_player)]
+    player_stat = player_row[stat]
+
+    st.header(f"{catalog.label(table)}: {stat_label}")
+    if pd.isna(player_stat):
+        st.markdown(f"Sorry! There is no {stat_label.lower()} available for **{selected_player}**.")
+    else:
+        player_rank = int(metric.rank(player_stat, higher_is_better))
+        percentile = metric.percentile(player_stat, higher_is_better)
+        #Say which way a stat the leaderboard isn't ranked by was ranked
+        direction = "" if primary else f" ({'higher' if higher_is_better else 'lower'} is better)"
+        st.markdown(
+            f"**{selected_player}** has **{player_stat:g}** {stat_label.lower()}, ranking **#{player_rank}** out of "
+            f"**{len(metric)}** players and placing them in the **{percentile}th percentile**{direction}."
+        )
+
+        #Peer comparison section: moving the slider reruns only this
+        @fragment
+        def stat_peers(table, stat, stat_label, df_board, metric, higher_is_better, selected_player, player_row):
+            #Peers: rows in best-to-worst order of the stat, centered on the selected player
+            st.subheader(f"How many players should {selected_player} be compared against?")
+            compare_count = st.slider("Number of players to compare (odd number)", 3, 19, step=2, value=9)
+            ranked = metric.ranked(higher_is_better)
+            selected_index = int(np.flatnonzero(ranked == player_row.name)[0])
+
+            #Build the peer chart only the first time this leaderboard / stat / player / slider combination is shown
+            def build_peers():
+                start, end = peer_window(selected_index, compare_count, len(ranked))
+                peers = df_board.loc[ranked[start:end], ['name', stat]]
+                fig_peers = go.Figure(go.Bar(
+                    x=peers[stat],
+                    y=peers['name'].astype(str),
+                    orientation='h',
+                    marker_color=['red' if label == player_row.name else 'white' for label in peers.index],
+                    hovertemplate='%{y}: %{x}<extra></extra>',
+                ))
+                fig_peers.update_layout(
+                    title=f"{stat_label}: {selected_player} vs Peers",
+                    xaxis_title=stat_label,
+                    yaxis=dict(autorange='reversed', tickfont=dict(color='black')),
+                    xaxis=dict(tickfont=dict(color='black')),
+                    showlegend=False,
+                    title_font=dict(size=18, color='black'),
+                    xaxis_title_font=dict(size=18, color='black'),
+                    font=dict(size=18, color='black'),
+                    plot_bgcolor='#D9AC30',
+                    paper_bgcolor='#D9AC30',
+                )
+                return fig_peers
+
+            fig_peers = figures.get(('explorer_peers', table, stat, selected_player, compare_count), build_peers)
+            st.plotly_chart(fig_peers, use_container_width=True)
+
+        stat_peers(table, stat, stat_label, df_board, metric, higher_is_better, selected_player, player_row)
+
+        #Distribution section (reruns on its own)
+        @fragment
+        def stat_distribution(table, stat, stat_label, metric, selected_player, player_stat):
+            #Distribution of the stat over the whole leaderboard (built once per leaderboard and stat)
+            def build_distribution():
+                fig_distribution = go.Figure()
+                if fast_charts:
+                    fig_distribution.add_traces(box_traces(box_stats(metric.values), 'All Players'))
+                else:
+                    fig_distribution.add_trace(go.Box(
+                        y=metric.values,
+                        boxpoints='outliers',
+                        name='All Players',
+                        marker_color='white',
+                        hoverinfo='skip'
+                    ))
+                fig_distribution.update_layout(
+                    title=f"{stat_label} Distribution",
+                    yaxis_title=stat_label,
+                    showlegend=True,
+                    xaxis=dict(showticklabels=False),
+                    yaxis=dict(tickfont=dict(color='black')),
+                    title_font=dict(size=18, color='black'),
+                    yaxis_title_font=dict(size=18, color='black'),
+                    font=dict(size=18, color='black'),
+                    plot_bgcolor='#D9AC30',
+                    paper_bgcolor='#D9AC30',
+                    legend=dict(font=dict(color='black')),
+                )
+                return fig_distribution
+
+            #...with an arrow at the selected player
+            st.header(f"{stat_label} Distribution")
+            fig_distribution = figures.get(
+                ('explorer_box', table, stat, fast_charts, selected_player),
+                lambda: highlight_box(figures.get(('explorer_box', table, stat, fast_charts), build_distribution),
+                                      selected_player, player_stat),
             )
-        ],
-    )
+            st.plotly_chart(fig_distribution, use_container_width=True)
 
-    st.markdown(f"**{selected_player}** has an ERA of **{era_stat:.2f}** (lower ERA is better), placing them in the **{percentile}th percentile**.")
-    st.plotly_chart(fig_era_box, use_container_width=True)
+        stat_distribution(table, stat, stat_label, metric, selected_player, player_stat)
+
+#####################################################################################################################
+####Player Profile - one player across every leaderboard
+elif player_type == "Player Profile":
+    catalog = load_catalog()
+
+    st.sidebar.header("Player Selection")
+    search = load_profile_search()
+    selected_id = pick_player(search, "Search players", "Choose a player", format_func=search.name)
+
+    #The whole career profile is one row of the pre-joined player_profile table
+    profile = load_player_profile(selected_id).iloc[0]
+
+    st.header(f"Career Profile: {profile['name']}")
+    rows = []
+    for table in catalog.leaderboards():
+        if table in profile.index and pd.notna(profile[table]):
+            rows.append({
+                'Leaderboard': catalog.label(table),
+                'Stat': catalog.primary_stat(table).replace('_', ' ').title(),
+                'Value': f"{profile[table]:g}",
+                'Rank': int(profile[f'{table}_rank']),
+            })
+    if rows:
+        st.markdown(f"**{profile['name']}** appears on **{len(rows)}** of the **{len(catalog.leaderboards())}** all-time leaderboards.")
+        st.dataframe(pd.DataFrame(rows).sort_values('Rank', kind='stable'), hide_index=True, use_container_width=True)
+    else:
+        st.markdown(f"Sorry! **{profile['name']}** isn't on any of the leaderboards.")
+    #Two players share this spelling: leaderboards listing both are left out, and the others may be either one's
+    shared = int(profile.get('shared_name_leaderboards', 0))
+    if shared:
+        st.warning(f"Another player is also named {profile['name']}. {shared} leaderboard(s) list both and aren't shown "
+                   f"(there's no telling which row is whose), and the leaderboards above may mix the two careers.")
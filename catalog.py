@@ -0,0 +1,60 @@
+import re
+from collections import Counter
+
+from leaderboard_columns import non_stat_columns, primary_stat
+
+#Column types that can be charted
+numeric_types = ('INTEGER', 'REAL')
+
+
+#Readable name for a leaderboard table
+def _label(table):
+    label = re.sub(r'^mlb_|_on_baseball_almanac$|_for_pitchers$', '', table)
+    label = re.sub(r'(_all_time)?(_career)?(_top_1,000)?_leaders(_top_1,000)?$', '', label)
+    return ' '.join(label.replace('_', ' ').split()).title()
+
+
+#What tables and columns the database holds, discovered once
+class Catalog:
+    """The schema of every table ({table: [(column, type), ...]}) with helpers for picking leaderboards and stats."""
+
+    def __init__(self, schema, categories=None):
+        self.schema = schema
+        #{table: 'hitting' or 'pitching'}, the folder each leaderboard was scraped into
+        self.categories = categories or {}
+        self.labels = {}
+        #The scraped leaderboards have a rank and a source; the loader's derived tables don't
+        for table in schema:
+            if not {'rank', 'source'} <= set(self.columns(table)):
+                continue
+            label = _label(table)
+            #'MLB Top 1,000 Leaders' doesn't say what it's about
+            if label.startswith('Top '):
+                label = self.primary_stat(table).replace('_', ' ').title()
+            self.labels[table] = label
+        #Some menus share a title (e.g. hit by pitch for hitters and for pitchers); say which category each one is
+        shared = {label for label, count in Counter(self.labels.values()).items() if count > 1}
+        for table, label in self.labels.items():
+            if label in shared:
+                category = self.categories.get(table)
+                self.labels[table] = f"{label} ({category.title() if category else table})"
+        self._leaderboards = sorted(self.labels, key=self.labels.get)
+
+    def columns(self, table):
+        return [column for column, _ in self.schema[table]]
+
+    def leaderboards(self):
+        """The leaderboard tables, in order of their labels."""
+        return self._leaderboards
+
+    def stat_columns(self, table):
+        """Numeric columns of a table that are stats (not its rank)."""
+        return [column for column, column_type in self.schema[table]
+                if column_type in numeric_types and column not in non_stat_columns]
+
+    def primary_stat(self, table):
+        """The stat a leaderboard is ranked by."""
+        return primary_stat(self.columns(table))
+
+    def label(self, table):
+        return self.labels.get(table, table)
@@ -1,6 +1,12 @@
+import argparse
+import io
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext, redirect_stdout
 import pandas as pd
 import numpy as np
+from manifest import file_entry, is_unchanged, load_manifest, save_manifest
 
 #Folders with the raw CSVs
 raw_csv = {
@@ -8,10 +14,31 @@ raw_csv = {
     'pitching': 'csv/pitching'
 }
 clean_csv = 'csv_clean'
+#Hash, size, rows and columns of every raw csv cleaned so far (and of the clean csv it produced)
+clean_manifest = os.path.join(clean_csv, 'manifest.json')
+
+#Text columns are object dtype in older pandas and the 'str' dtype in pandas 3
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+#Does every value of the sample contain a digit? (one regex over the whole sample)
+def _looks_numeric(sample):
+    return bool(sample.str.contains(r'\d', regex=True).all())
+
+
+#Fill missing ranks with the rank above + 1 (whole-column arithmetic)
+def _fill_ranks(ranks):
+    values = np.trunc(ranks.to_numpy(dtype='float64', na_value=np.nan))
+    positions = np.arange(len(values))
+    #Position of the closest known rank at or above each row (-1 if there is none yet)
+    last_known = np.maximum.accumulate(np.where(np.isnan(values), -1, positions))
+    #Known rank + how many rows below it we are; rows before the first known rank stay missing
+    filled = np.where(last_known >= 0, values[last_known] + (positions - last_known), np.nan)
+    #Whole numbers stay integers unless something is still missing (like the original list of ints/NaN)
+    if not np.isnan(filled).any():
+        return filled.astype('int64')
+    return filled
 
-#Make a folder for the clean csvs if they don't already exists
-for category in raw_csv:
-    os.makedirs(os.path.join(clean_csv, category), exist_ok=True)
 
 #Cleaning dataframe function
 def clean_dataframe(df):
@@ -33,7 +60,7 @@ def clean_dataframe(df):
     #Split columns with values like "# (#.#)"
     new_columns = {}
     for col in df.columns:
-        if df[col].dtype == object:
+        if _is_text(df[col]):
             split_values = df[col].dropna().astype(str).str.extract(r'^([\d\.\-]+) \(([\d\.\-]+)\)$', expand=True)
             if not split_values.isnull().all().all():
                 #If pattern matched for at least some rows, create new columns
@@ -51,12 +78,12 @@ def clean_dataframe(df):
 
     #Convert string numeric columns to int or float properly
     for col in df.columns:
-        if df[col].dtype == object:
+        if _is_text(df[col]):
             #Remove commas and strip whitespace
             df[col] = df[col].str.replace(',', '').str.strip()
             #Attempt numeric conversion if the column looks numeric
             sample = df[col].dropna().head(20).astype(str)
-            if all(any(char.isdigit() for char in val) for val in sample):
+            if _looks_numeric(sample):
                 df[col] = pd.to_numeric(df[col], errors='coerce')
                 #If all non-NaN values are whole numbers, convert to integer type
                 if (df[col].dropna() % 1 == 0).all():
@@ -67,30 +94,8 @@ def clean_dataframe(df):
         try:
             #Convert all rows in 'Rank' to numbers or coercing errors to NaN
             df['Rank'] = pd.to_numeric(df['Rank'], errors='coerce')
-            #Start off with a fixed ranked empty list and don't determine a last rank at the beginning
-            fixed_ranks = []
-            last_rank = None
-
-            #For the values in the rank column of the dataframe (Iterate)
-            for val in df['Rank']:
-                #If the value we are currently iterating on is not NaN
-                if not np.isnan(val):
-                    #If not, convert the current value into the 'last' valid rank 
-                    last_rank = int(val)
-                    #Add the valid rank to the list of fixed ranks
-                    fixed_ranks.append(last_rank)
-                else:
-                    #If the last_rank recorded is NaN BUT we have a recorded last_rank
-                    if last_rank is not None:
-                        #Add 1 to the current last_rank
-                        last_rank += 1
-                        #Append the new last rank onto the fixed ranks
-                        fixed_ranks.append(last_rank)
-                    else:
-                        #If the first ranked value is missing, keep it as NaN
-                        fixed_ranks.append(np.nan)
-            #After iteration through the rank column, have the fixed_ranks be the new rank column
-            df['Rank'] = fixed_ranks
+            #Have the fixed ranks be the new rank column
+            df['Rank'] = _fill_ranks(df['Rank'])
 
         except Exception as e:
             print(f"Could not fix missing ranks due to error: {e}")
@@ -99,35 +104,127 @@ def clean_dataframe(df):
     #Return the dataframe with the updated ranks
     return df
 
-#Process all CSV files in the raw csv
-for category, raw_path in raw_csv.items():
-    #For each file in raw csvs
-    for filename in os.listdir(raw_path):
-        #If the file ends with .csv
-        if filename.endswith(".csv"):
-            #Join the raw_path and filename?
-            file_path = os.path.join(raw_path, filename)
-            print(f"Processing {file_path}")
-            try:
-                #Read the original (raw) csv file into a dataframe
-                df = pd.read_csv(file_path)
-
-                #Show original
-                print("Before cleaning:")
-                print(df.head(2))
-
-                #The new cleaned dataframes after the clean_dataframe function is run
-                cleaned_df = clean_dataframe(df)
-
-                #Verify cleaning
-                print("After cleaning:")
-                print(cleaned_df.head(2))
-
-                #Save the clean csv to the clean folder 
+#Clean one raw csv and save it in the clean folder
+def clean_file(file_path, save_path):
+    """Read a raw csv, clean it and write the result to save_path; returns (raw_df, cleaned_df)."""
+    #Read the original (raw) csv file into a dataframe
+    df = pd.read_csv(file_path)
+
+    #Show original
+    print("Before cleaning:")
+    print(df.head(2))
+
+    #The new cleaned dataframes after the clean_dataframe function is run
+    cleaned_df = clean_dataframe(df)
+
+    #Verify cleaning
+    print("After cleaning:")
+    print(cleaned_df.head(2))
+
+    #Save the clean csv to the clean folder
+    cleaned_df.to_csv(save_path, index=False)
+    print(f"Saved cleaned file: {save_path}\n")
+    return df, cleaned_df
+
+
+#Clean one file and report how it went (run directly, or inside a worker process)
+def clean_job(key, file_path, save_path, quiet=False):
+    """Run clean_file and return a result dict with the manifest entry, shapes, timing and any error."""
+    result = {'key': key, 'entry': None, 'shapes': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        #Worker processes keep their progress prints to themselves so the output doesn't interleave
+        with redirect_stdout(io.StringIO()) if quiet else nullcontext():
+            df, cleaned_df = clean_file(file_path, save_path)
+        result['entry'] = {
+            'source': file_entry(file_path, df),
+            'output': file_entry(save_path, cleaned_df),
+        }
+        result['shapes'] = (df.shape, cleaned_df.shape)
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean the scraped leaderboard CSVs in csv/ into csv_clean/.")
+    parser.add_argument('--force', action='store_true', help="re-clean every file, even ones that haven't changed")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes to clean with (default 1; 0 = one per CPU core)")
+    args = parser.parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+
+    #Make a folder for the clean csvs if they don't already exists
+    for category in raw_csv:
+        os.makedirs(os.path.join(clean_csv, category), exist_ok=True)
+
+    #What was cleaned last time (nothing if we're forcing a full rebuild)
+    manifest = {} if args.force else load_manifest(clean_manifest)
+    new_manifest = {}
+    jobs = []
+    skipped = 0
+
+    #Find the CSV files in the raw csv folders that need cleaning
+    for category, raw_path in raw_csv.items():
+        #For each file in raw csvs
+        for filename in sorted(os.listdir(raw_path)):
+            #If the file ends with .csv
+            if filename.endswith(".csv"):
+                #Join the raw_path and filename?
+                file_path = os.path.join(raw_path, filename)
                 save_path = os.path.join(clean_csv, category, filename)
-                cleaned_df.to_csv(save_path, index=False)
-                print(f"Saved cleaned file: {save_path}\n")
-
-            #State an error to the user if file processing fails
-            except Exception as e:
-                print(f"Error processing {filename}: {e}\n")
+                key = f"{category}/{filename}"
+
+                #Skip files whose raw csv and clean csv are both exactly as recorded last time
+                entry = manifest.get(key)
+                if entry and is_unchanged(file_path, entry['source']) and is_unchanged(save_path, entry['output']):
+                    new_manifest[key] = entry
+                    skipped += 1
+                    continue
+                jobs.append((key, file_path, save_path))
+
+    #Clean them one after another, or across a pool of processes (results come back in job order either way)
+    started = time.perf_counter()
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(clean_job, *zip(*jobs), [True] * len(jobs)))
+    else:
+        results = []
+        for key, file_path, save_path in jobs:
+            print(f"Processing {file_path}")
+            results.append(clean_job(key, file_path, save_path))
+    elapsed = time.perf_counter() - started
+
+    #One line per file with its timing, in a fixed order
+    failures = []
+    for result in results:
+        if result['error']:
+            failures.append(result)
+            print(f"FAILED  {result['key']} ({result['seconds']:.2f}s)")
+            continue
+        new_manifest[result['key']] = result['entry']
+        before, after = result['shapes']
+        print(f"cleaned {result['key']} {before} -> {after} ({result['seconds']:.2f}s)")
+
+    #Remove clean files whose raw csv no longer exists
+    for key in manifest.keys() - new_manifest.keys():
+        category, filename = key.split('/', 1)
+        stale_path = os.path.join(clean_csv, category, filename)
+        if not os.path.exists(os.path.join(raw_csv[category], filename)) and os.path.exists(stale_path):
+            os.remove(stale_path)
+            print(f"Removed {stale_path} (raw csv is gone)")
+
+    save_manifest(clean_manifest, new_manifest)
+    print(f"Cleaned {len(results) - len(failures)} file(s) in {elapsed:.2f}s with {min(workers, max(len(jobs), 1))} worker(s), "
+          f"skipped {skipped} unchanged, {len(failures)} failed.")
+
+    #State an error to the user for every file that failed
+    if failures:
+        print("\nFailures:")
+        for result in failures:
+            print(f"  {result['key']}: {result['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from urllib.parse import quote
+
+#Bytes of the database file each connection may memory-map instead of read()ing into its own buffers
+default_mmap_size = 256 * 1024 * 1024
+#Prepared statements each connection keeps (sqlite3 reuses one when the same SQL text runs again)
+default_cached_statements = 256
+#Most connections a pool keeps open (a caller waits for one to come back when they're all in use)
+default_max_connections = 8
+
+
+#Read-only connections to one database file, checked out and returned
+class ConnectionPool:
+    """Lend out read-only connections, opened once and kept for the next caller.
+
+    Connections are opened with mode=ro (so nothing can write through them), memory-map the file (so
+    they share its pages through the OS page cache), and keep a cache of prepared statements, so a
+    parameterized query run again skips SQLite's parser. A connection goes back to the pool when its
+    caller is done rather than belonging to a thread, so it (and its statement cache) outlives the
+    thread of a Streamlit rerun, while concurrent sessions each check out their own instead of taking
+    turns on one. At most max_connections are open at once. When the loader swaps in a new database
+    file, idle connections are reopened the next time they're checked out.
+    """
+
+    def __init__(self, db_path, mmap_size=default_mmap_size, cached_statements=default_cached_statements,
+                 max_connections=default_max_connections):
+        self.path = db_path
+        self.mmap_size = mmap_size
+        self.cached_statements = cached_statements
+        self.max_connections = max_connections
+        #Idle (connection, id of the file it was opened on) pairs, most recently returned first
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_connections)
+        self._lock = threading.Lock()
+        #id(connection) -> id of the file it was opened on, for the connections checked out
+        self._checked_out = {}
+        self.opened = 0
+        self.reused = 0
+        self.reopened = 0
+
+    def _uri(self):
+        #Not cache=shared: SQLite matches shared caches by path, so after a swap new connections would join the old file's cache
+        return f"file:{quote(os.path.abspath(self.path))}?mode=ro"
+
+    def _file_id(self):
+        #A rebuild replaces the file in a single rename, which gives it a new inode
+        stat = os.stat(self.path)
+        return (stat.st_dev, stat.st_ino)
+
+    def _open(self):
+        #A connection moves between threads, but only the thread that checked it out uses it
+        conn = sqlite3.connect(self._uri(), uri=True, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        return conn
+
+    def checkout(self):
+        """Take a connection: an idle one if there is one (reopened if the database file was replaced), else a new one."""
+        self._slots.acquire()
+        try:
+            file_id = self._file_id()
+            try:
+                conn, conn_file_id = self._idle.get_nowait()
+            except queue.Empty:
+                conn = conn_file_id = None
+            if conn is None or conn_file_id != file_id:
+                reopened = conn is not None
+                if reopened:
+                    conn.close()
+                conn = self._open()
+                with self._lock:
+                    self.opened += 1
+                    self.reopened += reopened
+            else:
+                with self._lock:
+                    self.reused += 1
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._checked_out[id(conn)] = file_id
+        return conn
+
+    def checkin(self, conn):
+        """Give a connection from checkout() back to the pool."""
+        with self._lock:
+            file_id = self._checked_out.pop(id(conn))
+        self._idle.put((conn, file_id))
+        self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """A connection checked out for the with block and returned after it."""
+        conn = self.checkout()
+        try:
+            yield conn
+        finally:
+            self.checkin(conn)
+
+    def close(self):
+        """Close the idle connections (ones still checked out come back to the pool as usual)."""
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+
+    def stats(self):
+        """How often connections were opened, reused and reopened after the file changed, and how many are open."""
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'reopened': self.reopened,
+                'in_use': len(self._checked_out),
+                'idle': self._idle.qsize(),
+                'max_connections': self.max_connections,
+                'mmap_size': self.mmap_size,
+                'cached_statements': self.cached_statements,
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+#One pool per database file for the whole process
+def get_pool(db_path):
+    """The shared ConnectionPool for db_path."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(db_path)
+        return _pools[key]
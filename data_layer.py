@@ -0,0 +1,214 @@
+import threading
+from functools import wraps
+
+import pandas as pd
+
+from catalog import Catalog
+from figure_cache import FigureCache
+from name_search import NameIndex
+from player_store import PlayerStore
+from plot_data import box_stats, hover_text
+from rank_engine import RankEngine
+from query_log import recent_queries
+from storage import get_storage
+
+
+#Process-wide cache of the dashboard dataframes
+class DataCache:
+    """Keep loaded dataframes in memory until the stored data (SQLite file or columnar folder) changes."""
+
+    def __init__(self, storage):
+        self.storage = storage
+        #Loader name -> ready-to-plot dataframe
+        self._frames = {}
+        #Cheap signature (mtime, size) and content hash of the data the frames were loaded from
+        self._stat = None
+        self._digest = None
+        #Re-entrant so a loader can build on other cached frames
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _check_storage(self):
+        """Drop every cached frame if the stored data has changed."""
+        stat = self.storage.signature()
+        if stat == self._stat:
+            return
+        #Only hash the contents when the modified time or size moved, so a plain 'touch' keeps the cache
+        digest = self.storage.digest()
+        if digest != self._digest:
+            if self._frames:
+                self.invalidations += 1
+            self._frames.clear()
+            self._digest = digest
+        self._stat = stat
+
+    def get(self, key, loader):
+        """Return the cached frame for key, running loader(storage) on a miss."""
+        with self._lock:
+            self._check_storage()
+            if key in self._frames:
+                self.hits += 1
+                return self._frames[key]
+            self.misses += 1
+            df = loader(self.storage)
+            self._frames[key] = df
+            return df
+
+    def clear(self):
+        """Forget every cached frame."""
+        with self._lock:
+            self._frames.clear()
+            self._stat = None
+            self._digest = None
+
+    def stats(self):
+        """Hit/miss counters for the cache."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'cached_frames': len(self._frames),
+                'storage': type(self.storage).__name__,
+            }
+
+
+#One cache shared by every Streamlit session in the server process (SQLite unless MLB_STORAGE says otherwise)
+_cache = DataCache(get_storage())
+
+
+def cached(loader):
+    """Serve loader's dataframe from the shared cache (the returned frame must not be modified)."""
+    @wraps(loader)
+    def wrapper():
+        return _cache.get(loader.__name__, loader)
+    return wrapper
+
+
+def cache_stats():
+    """Hit/miss counters of the shared data cache."""
+    return _cache.stats()
+
+
+#Every dashboard table in one memory-compact, read-only store shared by all sessions
+@cached
+def load_player_store(storage):
+    return PlayerStore({
+        #Hitters on the home run leaderboard, already ranked (with their base running stats when available)
+        'hitters': storage.read_table('hitter_stats'),
+        #Every player with both stolen base and caught stealing data
+        'base_running': storage.read_table('base_running_stats', ['name', 'sb', 'cs']),
+        #Pitchers with saves, games pitched and ERA, with save % rank and ERA percentile
+        'pitchers': storage.read_table('pitcher_stats'),
+    })
+
+
+def load_home_runs():
+    return load_player_store().table('hitters')
+
+
+def load_base_running():
+    return load_player_store().table('base_running')
+
+
+def load_pitchers():
+    return load_player_store().table('pitchers')
+
+
+#Box statistics and hover labels for the dashboard charts, computed once per data version
+@cached
+def load_chart_data(storage):
+    store = load_player_store()
+    base_running = store.table('base_running')
+    pitchers = store.table('pitchers')
+    return {
+        'home_run_box': box_stats(store.table('hitters')['home_runs']),
+        'era_box': box_stats(pitchers['era']),
+        'base_running_hover': hover_text(base_running['name'], [
+            ('Bases stolen', base_running['sb']), ('Times caught stealing', base_running['cs'])]),
+        'pitcher_hover': hover_text(pitchers['name'], [
+            ('Games Pitched', pitchers['games_pitched']), ('Games Saved', pitchers['saves'])]),
+    }
+
+
+#Built chart figures (a new, empty cache whenever the data changes)
+@cached
+def load_figure_cache(storage):
+    return FigureCache()
+
+
+#Tables and columns in the database, read once (not one query per table)
+@cached
+def load_catalog(storage):
+    schema = storage.schema()
+    #Which category (hitting / pitching) each leaderboard is, for boards that share a title
+    categories = {}
+    if 'leaderboard_categories' in schema:
+        df = storage.read_table('leaderboard_categories')
+        categories = dict(zip(df['leaderboard'], df['category']))
+    return Catalog(schema, categories)
+
+
+def load_leaderboard_store(table):
+    """A PlayerStore holding one leaderboard (cached like the dashboard tables, until the data changes)."""
+    return _cache.get(('leaderboard', table), lambda storage: PlayerStore({table: storage.read_table(table)}))
+
+
+#Names and ids of every player in the wide profile table (for the profile picker)
+@cached
+def load_profile_index(storage):
+    return storage.read_table('player_profile', ['name', 'player_id']).sort_values('name', ignore_index=True)
+
+
+#Type-ahead search over every profiled player's name (search() returns player ids)
+@cached
+def load_profile_search(storage):
+    profiles = load_profile_index()
+    return NameIndex(profiles['name'], profiles['player_id'].tolist())
+
+
+def load_player_search(dataset):
+    """A NameIndex over the names of 'hitters' (in rank order) or 'pitchers' (alphabetical), the order the pickers list them."""
+    def build(storage):
+        names = load_player_store().table(dataset)['name']
+        return NameIndex(names.sort_values() if dataset == 'pitchers' else names)
+    return _cache.get(('search', dataset), build)
+
+
+def load_leaderboard_search(table):
+    """A NameIndex over one leaderboard's names, in rank order."""
+    return _cache.get(('search', table), lambda storage: NameIndex(load_leaderboard_store(table).table(table)['name']))
+
+
+def load_player_profile(player_id):
+    """A player's row of player_profile (one indexed lookup; a dataframe with zero or one rows)."""
+    return _cache.storage.read_rows('player_profile', 'player_id', int(player_id))
+
+
+def find_player(dataset, name):
+    """Row position of a player in 'hitters', 'base_running' or 'pitchers' (None if missing), without scanning the table."""
+    return load_player_store().position(dataset, name)
+
+
+#Rank / percentile lookups over every numeric column of every table (each column is sorted on first use)
+@cached
+def load_rank_engine(storage):
+    return RankEngine(storage.read_table, storage.tables())
+
+
+def store_memory_report():
+    """Bytes used by each table in the player store, before and after compaction."""
+    return load_player_store().memory_report()
+
+
+def query_stats():
+    """The latest database queries this process ran (newest first) with their time, rows and any full scans."""
+    return pd.DataFrame(reversed(recent_queries), columns=['time', 'source', 'query', 'ms', 'rows', 'full_scans'])
+
+
+def pool_stats():
+    """Open/reuse counters of the read-only connection pool (None when reading Parquet / Arrow files)."""
+    pool = getattr(_cache.storage, 'pool', None)
+    return pool.stats() if pool is not None else None
@@ -1,11 +1,18 @@
-import sqlite3
+import csv
+import json
+import os
+import time
 import pandas as pd
+from connection_pool import get_pool
+from query_log import record_query, slow_query_log, slow_query_ms
 
 #Database to connect to
 mlb_db = 'mlb_hit_pitch_stats.db'
 
-#Actually connect to the mlb_hit_pitch_stats.db
-conn = sqlite3.connect(mlb_db)
+#Actually connect to the mlb_hit_pitch_stats.db (read-only, so a query can't change the data the dashboard shows)
+#The tool has one user, so it keeps the connection it checks out until it exits
+pool = get_pool(mlb_db)
+conn = pool.checkout()
 
 #Function to list all the tables from the MLB hit/pitch database
 def list_tables():
@@ -28,18 +35,122 @@ def show_columns(table_name):
     except Exception as e:
         print(f"Error showing columns: {e}")
 
+#Rows fetched from the cursor (and printed) at a time
+page_size = 50
+
+
+#Where streamed rows go: printed a page at a time, or appended to a CSV / JSONL file
+class _RowSink:
+    def __init__(self, columns, export_path=None):
+        self.columns = columns
+        self.export_path = export_path
+        self._file = None
+        self._writer = None
+        if export_path:
+            extension = os.path.splitext(export_path)[1].lower()
+            if extension not in ('.csv', '.jsonl'):
+                raise ValueError("Export file must end in .csv or .jsonl")
+            self._file = open(export_path, 'w', encoding='utf-8', newline='')
+            if extension == '.csv':
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(columns)
+
+    def write(self, rows, first_row_number):
+        if self._file is None:
+            #Each page is formatted on its own, so nothing waits for the rest of the result
+            print(pd.DataFrame(rows, columns=self.columns).to_string(index=False, header=first_row_number == 1))
+        elif self._writer is not None:
+            self._writer.writerows(rows)
+        else:
+            for row in rows:
+                self._file.write(json.dumps(dict(zip(self.columns, row)), default=str) + '\n')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+#Run a query and hand its rows over a batch at a time
+def stream_query(query, limit=None, export_path=None, interactive=True, with_plan=False):
+    """Run query and print (or export) its rows in pages of page_size as they are fetched.
+
+    Stops after limit rows if given. export_path (.csv or .jsonl) writes the rows there instead of printing them.
+    When interactive, the user presses Enter between printed pages (or 'q' to stop).
+    Returns {'rows', 'seconds', 'first_row_seconds', 'rows_per_second', 'record'}, where record is the
+    query_log record (with the query plan and full-table scans when with_plan is set or the query was slow).
+    """
+    start = time.perf_counter()
+    first_row_seconds = None
+    rows_seen = 0
+    #Time spent waiting for the user between pages (left out of the timings)
+    waiting = 0
+    cursor = conn.execute(query)
+    try:
+        #Statements that return no rows (e.g. a PRAGMA setting) have no columns
+        if cursor.description is None:
+            seconds = time.perf_counter() - start
+            return {'rows': 0, 'seconds': seconds, 'first_row_seconds': None, 'rows_per_second': 0,
+                    'record': record_query(conn, query, seconds, 0, 'database_query', with_plan=with_plan)}
+        sink = _RowSink([col[0] for col in cursor.description], export_path)
+        try:
+            while limit is None or rows_seen < limit:
+                batch = cursor.fetchmany(page_size if limit is None else min(page_size, limit - rows_seen))
+                if not batch:
+                    break
+                if first_row_seconds is None:
+                    first_row_seconds = time.perf_counter() - start
+                sink.write(batch, rows_seen + 1)
+                rows_seen += len(batch)
+                if interactive and not export_path and len(batch) == page_size:
+                    paused = time.perf_counter()
+                    answer = input(f"-- {rows_seen} rows so far; Enter for more, q to stop: ")
+                    waiting += time.perf_counter() - paused
+                    if answer.strip().lower() == 'q':
+                        break
+        finally:
+            sink.close()
+    finally:
+        cursor.close()
+    seconds = time.perf_counter() - start - waiting
+    return {
+        'rows': rows_seen,
+        'seconds': seconds,
+        'first_row_seconds': first_row_seconds,
+        'rows_per_second': rows_seen / seconds if seconds > 0 else 0,
+        'record': record_query(conn, query, seconds, rows_seen, 'database_query', with_plan=with_plan),
+    }
+
+
 #Function to let the user run their own queries
 def run_query():
-    """Run a custom SQL query from user input."""
+    """Run a custom SQL query from user input, streaming the result instead of loading it all first."""
     try:
         user_query = input("\nEnter your SQL query (in a single line; Press Enter to continue):\n> ")
-        # Run the user's query through the SQLite connection
-        df = pd.read_sql(user_query, conn)
+        limit = input("Row limit (Enter for no limit): ").strip()
+        limit = int(limit) if limit else None
+        export_path = input("Export to a .csv or .jsonl file (Enter to print the rows): ").strip() or None
+        with_plan = input("Show the query plan? (y/N): ").strip().lower() == 'y'
+
         print("\nQuery Result:")
-        if df.empty:
+        stats = stream_query(user_query, limit=limit, export_path=export_path, with_plan=with_plan)
+        if stats['rows'] == 0:
             print("Query executed successfully but returned no rows.")
-        else:
-            print(df.to_string(index=False))
+        elif export_path:
+            print(f"Wrote {stats['rows']} rows to {export_path}.")
+        #How long the first row took to arrive, and the overall throughput
+        first_row = f"{stats['first_row_seconds'] * 1000:.1f} ms" if stats['first_row_seconds'] is not None else "n/a"
+        print(f"{stats['rows']} rows in {stats['seconds']:.3f}s ({stats['rows_per_second']:,.0f} rows/sec); "
+              f"first row after {first_row}.")
+        #The plan (asked for, or added because the query was slow) and any tables read from end to end
+        record = stats['record']
+        if 'plan' in record:
+            print("\nQuery plan:")
+            for line in record['plan']:
+                print(f"  {line}")
+            for line in record['full_scans']:
+                print(f"Full table scan: {line} (an index on the filtered / joined column may help)")
+        if record['ms'] >= slow_query_ms:
+            print(f"Slow query (over {slow_query_ms:g} ms) logged to {slow_query_log}.")
     except Exception as e:
         print(f"Query failed: {e}")
 
@@ -76,7 +187,8 @@ def main():
             print("Invalid option. Try again.")
 
     #Close the connection
-    conn.close()
+    pool.checkin(conn)
+    pool.close()
     #Tell the user the main query program has exited
     print("Exit complete")
 
@@ -0,0 +1,52 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.graph_objects as go
+
+#How many figures a cache keeps before dropping the least recently used
+default_max_figures = 256
+
+
+#Built Plotly figures, shared by every session
+class FigureCache:
+    """Bounded LRU of serialized figures keyed on (chart id, inputs...).
+
+    get() always hands back a new Figure, so callers can overlay traces without touching the cached copy.
+    """
+
+    def __init__(self, max_figures=default_max_figures):
+        self.max_figures = max_figures
+        #Key -> figure JSON, least recently used first
+        self._figures = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        """The figure for key, calling build() (which returns a go.Figure) on a miss."""
+        with self._lock:
+            spec = self._figures.get(key)
+            if spec is not None:
+                self._figures.move_to_end(key)
+                self.hits += 1
+        #Build outside the lock: a build may itself get() a cached base figure
+        if spec is None:
+            spec = build().to_json()
+            with self._lock:
+                self.misses += 1
+                self._figures[key] = spec
+                while len(self._figures) > self.max_figures:
+                    self._figures.popitem(last=False)
+        #The JSON was validated when the figure was first built, so skip validating it again
+        return go.Figure(json.loads(spec), _validate=False)
+
+    def stats(self):
+        """Hit/miss counters and size of the cache."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'figures': len(self._figures),
+                'bytes': sum(len(spec) for spec in self._figures.values()),
+            }
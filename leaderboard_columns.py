@@ -0,0 +1,10 @@
+#Columns every leaderboard carries besides its stats (the name and rank it was scraped with, and the ones the loader adds)
+non_stat_columns = ['name', 'rank', 'source', 'player_key', 'player_id']
+
+
+#The leaderboard's stat column (the first column that isn't the name, rank or one we added)
+def primary_stat(columns):
+    for col in columns:
+        if col not in non_stat_columns:
+            return col
+    return None
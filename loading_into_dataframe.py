@@ -1,52 +1,469 @@
+import argparse
 import os
 import sqlite3
+import numpy as np
 import pandas as pd
+from cleaning_data import clean_dataframe, raw_csv
+from leaderboard_columns import primary_stat
+from manifest import file_entry, is_unchanged, load_manifest, save_manifest
+from player_names import distinct_player_keys
+from query_log import timed_query
+from rank_engine import SortedMetric
+from reconcile import reconcile_players
+from storage import columnar_dir, columnar_formats, write_columnar
 
 #Files to note
 clean_csv_files = 'csv_clean'
 db_create = 'mlb_hit_pitch_stats.db'
+#Hash, size, rows and columns of every csv loaded into the database
+load_manifest_file = 'mlb_hit_pitch_stats.manifest.json'
+#The new database is built here, then renamed over db_create in one step
+db_build = db_create + '.building'
+#Pairs of spellings checked by hand to be the same player (columns spelling, same_as)
+player_merges_file = 'player_merges.csv'
+#Tables the loader derives from the leaderboards
+derived_tables = ['leaderboard_categories', 'player_ids', 'hitter_stats', 'base_running_stats', 'pitcher_stats', 'player_profile']
 
-#Connect to SQLite database
-conn = sqlite3.connect(db_create)
-cursor = conn.cursor()
 
-#Go through each clean folder (hitting and pitching)
-for folder in ['hitting', 'pitching']:
-    #Go to the clean folders (csv_clean) with hitting and pitching
-    folder_path = os.path.join(clean_csv_files, folder)
+#Rows inserted per executemany call
+insert_batch_size = 5000
 
-    #Iterate through each CSV file in the csv_clean folders
-    for filename in os.listdir(folder_path):
-        #Make sure it's a CSV
-        if filename.endswith('.csv'):
-            file_path = os.path.join(folder_path, filename)
-            #Double check and clean name before officially putting it into the db table names
-            table_name = os.path.splitext(filename)[0].lower().replace(" ", "_").replace("-", "_")
 
-            #Display progress to user
-            print(f"Importing {file_path} as table '{table_name}'...")
+#Names of the tables already in the database
+def existing_tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
 
-            try:
-                #Load CSV into a DataFrame
-                df = pd.read_csv(file_path)
 
-                #Double-check column names for inappropriate characters not compatible with SQLite
-                df.columns = [col.strip().lower().replace(" ", "_").replace("-", "_") for col in df.columns]
+#SQLite column type for a pandas dtype (the same types to_sql picks)
+def _sqlite_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return 'INTEGER'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'REAL'
+    return 'TEXT'
 
-                # Add a new column 'source' indicating whether it's hitting or pitching data
-                df['source'] = folder
 
-                #Import DataFrame into SQLite as a table
-                df.to_sql(table_name, conn, if_exists='replace', index=False)
-                #Let user know of successful import with information about the rows
-                print(f"Successfully imported '{table_name}' with {len(df)} rows.\n")
+#Replace a table with a dataframe's rows
+def write_table(conn, table_name, df):
+    """Recreate table_name from df in one transaction, inserting batches with a single prepared INSERT."""
+    columns = ', '.join(f'"{col}" {_sqlite_type(dtype)}' for col, dtype in df.dtypes.items())
+    placeholders = ', '.join('?' * len(df.columns))
+    insert = f'INSERT INTO "{table_name}" VALUES ({placeholders})'
 
-            #Let user know if the import fails
-            except Exception as e:
-                print(f"Failed to import {filename}: {e}\n")
+    #Finish anything still open so the whole table swap is one transaction
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute('BEGIN')
+    try:
+        conn.execute(f'DROP TABLE IF EXISTS "{table_name}"')
+        conn.execute(f'CREATE TABLE "{table_name}" ({columns})')
+        for start in range(0, len(df), insert_batch_size):
+            chunk = df.iloc[start:start + insert_batch_size]
+            #Plain Python values with None for anything missing (sqlite3 can't bind NumPy scalars or pd.NA)
+            rows = chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None)
+            conn.executemany(insert, rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
 
-#Close the connection
-conn.close()
 
-#Print success message to user
-print(f"All data imported into {db_create}.")
+#Load every clean CSV (or every raw CSV, cleaned on the way in) into its own table
+def import_csvs(conn, manifest, from_raw=False, write_clean=False):
+    """Import each changed csv as a table; returns (new manifest, tables changed).
+
+    With from_raw the csv/<folder> files are cleaned in memory and inserted straight away,
+    skipping the csv_clean/ round trip (write_clean still saves the clean csv too).
+    """
+    tables = existing_tables(conn)
+    new_manifest = {}
+    loaded = skipped = dropped = 0
+
+    #Go through each folder (hitting and pitching)
+    for folder in ['hitting', 'pitching']:
+        #Go to the clean folders (csv_clean) with hitting and pitching, or the raw ones
+        folder_path = raw_csv[folder] if from_raw else os.path.join(clean_csv_files, folder)
+
+        #Iterate through each CSV file in the folder
+        for filename in sorted(os.listdir(folder_path)):
+            #Make sure it's a CSV
+            if filename.endswith('.csv'):
+                file_path = os.path.join(folder_path, filename)
+                #Double check and clean name before officially putting it into the db table names
+                table_name = os.path.splitext(filename)[0].lower().replace(" ", "_").replace("-", "_")
+                key = f"{folder}/{filename}"
+
+                #Skip csvs that haven't changed since they were loaded (as long as their table is still there)
+                entry = manifest.get(key)
+                if entry and entry['table'] in tables and is_unchanged(file_path, entry):
+                    new_manifest[key] = entry
+                    skipped += 1
+                    continue
+
+                #Display progress to user
+                print(f"Importing {file_path} as table '{table_name}'...")
+
+                try:
+                    #Load CSV into a DataFrame
+                    df = pd.read_csv(file_path)
+                    if from_raw:
+                        #Clean it in memory (one parse of the raw file instead of raw -> clean csv -> parse again)
+                        df = clean_dataframe(df)
+                        if write_clean:
+                            df.to_csv(os.path.join(clean_csv_files, folder, filename), index=False)
+
+                    #Double-check column names for inappropriate characters not compatible with SQLite
+                    df.columns = [col.strip().lower().replace(" ", "_").replace("-", "_") for col in df.columns]
+
+                    # Add a new column 'source' indicating whether it's hitting or pitching data
+                    df['source'] = folder
+                    #Normalized player name (case, whitespace and accents) used for lookups and joins
+                    #(two spellings on this leaderboard that only differ by accents keep them, as they're two players)
+                    df['player_key'] = distinct_player_keys(df['name'])
+
+                    #Import DataFrame into SQLite as a table
+                    write_table(conn, table_name, df)
+                    #Index the player key, the leaderboard's stat and the rank
+                    create_indexes(conn, table_name, ['player_key', primary_stat(df.columns), 'rank'])
+                    #Let user know of successful import with information about the rows
+                    print(f"Successfully imported '{table_name}' with {len(df)} rows.\n")
+                    new_manifest[key] = dict(file_entry(file_path, df), table=table_name)
+                    loaded += 1
+
+                #Let user know if the import fails
+                except Exception as e:
+                    print(f"Failed to import {filename}: {e}\n")
+
+    #Drop the tables of csvs that have been removed
+    for key in manifest.keys() - new_manifest.keys():
+        folder, filename = key.split('/', 1)
+        if not os.path.exists(os.path.join(raw_csv[folder] if from_raw else os.path.join(clean_csv_files, folder), filename)):
+            conn.execute(f'DROP TABLE IF EXISTS "{manifest[key]["table"]}"')
+            print(f"Dropped table '{manifest[key]['table']}' ({key} is gone)")
+            dropped += 1
+    conn.commit()
+
+    print(f"Imported {loaded} table(s), skipped {skipped} unchanged, dropped {dropped}.")
+    return new_manifest, loaded + dropped
+
+
+#Create one index per column on a table (skipping columns the table doesn't have)
+def create_indexes(conn, table_name, columns):
+    existing = {row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')}
+    for col in columns:
+        if col in existing:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table_name}_{col}" ON "{table_name}" ("{col}")')
+    conn.commit()
+
+
+#Sort descending (ties keep their order) and rank with the rank engine's tie rule (tied values share a rank)
+def _rank_descending(df, column):
+    df = df.sort_values(by=column, ascending=False, kind='stable').reset_index(drop=True)
+    df[f'{column}_rank'] = SortedMetric(df[column]).rank(df[column])
+    return df
+
+
+#Read a query into a dataframe, timed (and logged if slow) through query_log
+def read_sql(query, conn):
+    with timed_query(conn, query, 'loader') as record:
+        df = pd.read_sql(query, conn)
+        record['rows'] = len(df)
+    return df
+
+
+#Which folder each leaderboard came from
+def build_leaderboard_categories(conn, manifest):
+    """Create leaderboard_categories (leaderboard, category): 'hitting' or 'pitching' for every leaderboard table.
+
+    The dashboard labels boards that share a title (e.g. hit by pitch) with their category.
+    """
+    df = pd.DataFrame([(entry['table'], key.split('/', 1)[0]) for key, entry in manifest.items()],
+                      columns=['leaderboard', 'category'])
+    write_table(conn, 'leaderboard_categories', df)
+    print(f"Built 'leaderboard_categories' ({len(df)} leaderboards).")
+
+
+#The player ids of the last build, so a rebuild gives everyone the same id again
+def load_player_ids(db_path):
+    """{spelling: player_id} from db_path's player_ids table (empty if there isn't one yet)."""
+    if not os.path.exists(db_path):
+        return {}
+    conn = sqlite3.connect(db_path)
+    try:
+        if 'player_ids' not in existing_tables(conn):
+            return {}
+        #Tables from before ids were given per spelling can't be matched up, so they start over
+        if 'spelling' not in {row[1] for row in conn.execute('PRAGMA table_info(player_ids)')}:
+            return {}
+        return dict(conn.execute('SELECT spelling, player_id FROM player_ids'))
+    finally:
+        conn.close()
+
+
+#Spellings someone has confirmed belong to one player
+def load_player_merges(path):
+    """[(spelling, same_as), ...] from path (empty if there's no file)."""
+    if not os.path.exists(path):
+        return []
+    merges = pd.read_csv(path, dtype=str).dropna()
+    return list(zip(merges['spelling'], merges['same_as']))
+
+
+#One canonical id per player, however their name is spelled across the leaderboards
+def build_player_ids(conn, tables, previous):
+    """Create player_ids (spelling, player_id, name) covering every spelling of a name on the leaderboards.
+
+    Ids are given per raw spelling rather than per player_key, since one key can cover two players
+    (accents folded away). The derived tables join on player_id, so a player whose name is spelled
+    differently on two pages (accents, mojibake, initials) still lines up; previous keeps the ids of the last build.
+    """
+    spellings = pd.concat(
+        [read_sql(f'SELECT name FROM "{table}" WHERE name IS NOT NULL ORDER BY rank', conn).assign(table=table)
+         for table in tables],
+        ignore_index=True,
+    )
+    ids, unconfirmed = reconcile_players(spellings, previous, load_player_merges(player_merges_file))
+    write_table(conn, 'player_ids', ids)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS "ix_player_ids_spelling" ON player_ids (spelling)')
+    create_indexes(conn, 'player_ids', ['player_id'])
+    print(f"Built 'player_ids' ({len(ids)} spellings of {ids['player_id'].nunique()} players).")
+    #Similar names are only merged once someone adds them to player_merges_file
+    for spelling, same_as, similarity in unconfirmed:
+        print(f"Possible match (not merged; add it to {player_merges_file} if it's one player): "
+              f"'{spelling}' / '{same_as}' ({similarity:.2f})")
+
+
+#A leaderboard's rows with their player ids, one row per player
+def read_board(conn, table, columns):
+    """name, the {column: alias} columns, player_key and player_id of table in file order.
+
+    A player_id listed more than once (two players sharing one spelling, e.g. the two Billy Hamiltons) is
+    left out, since there's no telling which row is whose; so joining two boards on player_id can't multiply rows.
+    """
+    select = ', '.join(f't."{column}" AS "{alias}"' for column, alias in columns.items())
+    df = read_sql(
+        f'''SELECT t.name, {select}, t.player_key, p.player_id
+            FROM "{table}" t JOIN player_ids p ON p.spelling = t.name ORDER BY t.rowid''', conn)
+    return df[~df['player_id'].duplicated(keep=False)].reset_index(drop=True)
+
+
+#Build the hitter tables the dashboard reads
+def build_hitter_stats(conn):
+    """Create hitter_stats (home run leaderboard + base running) and base_running_stats."""
+    #Home runs: title-cased names, ranked by home runs
+    df = read_sql(
+        '''SELECT h.name, h.home_runs, h.player_key, p.player_id
+           FROM "mlb_home_runs_all_time_top_1,000_leaders" h JOIN player_ids p ON p.spelling = h.name
+           ORDER BY h.rowid''', conn)
+    df['name'] = df['name'].str.title()
+    #Descending order, ties in leaderboard order; Drop na values (just in case they failed to drop in the cleaning)
+    df = df.dropna().sort_values(by='home_runs', ascending=False, kind='stable').reset_index(drop=True)
+    #Tied players share a rank (the rank engine's rule, so every view gives the same rank)
+    df['rank'] = SortedMetric(df['home_runs']).rank(df['home_runs'])
+    #Percent of players with strictly fewer home runs
+    df['home_run_percentile'] = SortedMetric(df['home_runs']).percentile(df['home_runs'])
+
+    #Stolen bases and caught stealing joined one-to-one on the canonical player id
+    stolen = read_board(conn, 'stolen_bases_all_time_leaders_on_baseball_almanac', {'stolen_bases': 'sb'})
+    caught = read_board(conn, 'caught_stealing_all_time_leaders_on_baseball_almanac', {'caught_stealing': 'cs'})
+    df_base = stolen.merge(caught[['player_id', 'cs']], on='player_id', validate='one_to_one')
+    df_base = df_base[['name', 'sb', 'cs', 'player_key', 'player_id']]
+    df_base['name'] = df_base['name'].str.title().str.strip()
+    df_base[['sb', 'cs']] = df_base[['sb', 'cs']].apply(pd.to_numeric, errors='coerce')
+    df_base = df_base.dropna()
+    #Stolen base success rate (0 when the player never attempted a steal)
+    attempts = df_base['sb'] + df_base['cs']
+    df_base['success_rate'] = (df_base['sb'] / attempts).fillna(0)
+    df_base['success_rate_percent'] = np.where(attempts > 0, np.round(100 * df_base['sb'] / attempts.where(attempts > 0), 1), 0.0)
+    df_base = _rank_descending(df_base, 'success_rate')
+    write_table(conn, 'base_running_stats', df_base)
+
+    #Base running joined onto the home run leaderboard; a player_id listed twice there is two players
+    #(e.g. the two Alex Gonzalezes), so neither row gets a base running line there's no telling is theirs
+    base = df_base.drop(columns=['name', 'player_key'])
+    shared = df['player_id'].duplicated(keep=False)
+    df = df.merge(base, on='player_id', how='left', validate='many_to_one')
+    df.loc[shared.to_numpy(), base.columns.drop('player_id')] = np.nan
+    df[['sb', 'cs', 'success_rate_rank']] = df[['sb', 'cs', 'success_rate_rank']].astype('Int64')
+    write_table(conn, 'hitter_stats', df)
+    create_indexes(conn, 'base_running_stats', ['player_key', 'player_id', 'success_rate_rank'])
+    create_indexes(conn, 'hitter_stats', ['player_key', 'player_id', 'rank'])
+    print(f"Built 'hitter_stats' ({len(df)} rows) and 'base_running_stats' ({len(df_base)} rows).")
+
+
+#Build the pitcher table the dashboard reads
+def build_pitcher_stats(conn):
+    """Create pitcher_stats (saves, games pitched and ERA with ranks and percentiles)."""
+    #Only pitchers with all three stats, joined one-to-one on the canonical player id
+    saves = read_board(conn, 'saves_all_time_leaders', {'games': 'saves'})
+    games = read_board(conn, 'games_pitched_all_time_leaders', {'games': 'games_pitched'})
+    era = read_board(conn, 'earned_run_average_all_time_leaders', {'era': 'era'})
+    df = (saves.merge(games[['player_id', 'games_pitched']], on='player_id', validate='one_to_one')
+          .merge(era[['player_id', 'era']], on='player_id', validate='one_to_one'))
+    df = df[['name', 'saves', 'games_pitched', 'era', 'player_key', 'player_id']]
+    df[['saves', 'games_pitched']] = df[['saves', 'games_pitched']].apply(pd.to_numeric, errors='coerce')
+
+    #Save percentage and its rank (1 is the highest save %, tied pitchers share one), keeping the merge order of the rows
+    df['save_percentage'] = (df['saves'] / df['games_pitched']) * 100
+    df['save_percentage_rank'] = pd.array(SortedMetric(df['save_percentage']).rank(df['save_percentage']), dtype='Int64')
+    #Percent of pitchers with a strictly higher (worse) ERA
+    df['era_percentile'] = SortedMetric(df['era']).percentile(df['era'], higher_is_better=False)
+
+    write_table(conn, 'pitcher_stats', df)
+    create_indexes(conn, 'pitcher_stats', ['player_key', 'player_id', 'save_percentage_rank'])
+    print(f"Built 'pitcher_stats' ({len(df)} rows).")
+
+
+#Build one wide row per player across every leaderboard
+def build_player_profile(conn, tables):
+    """Create player_profile: one row per player_id with "<table>" (the stat) and "<table>_rank" columns.
+
+    A player missing from a leaderboard has NULLs there. So does a player_id listed twice on one leaderboard
+    (two players sharing a spelling, e.g. the two Billy Hamiltons), since there's no telling which row is
+    whose; shared_name_leaderboards counts those leaderboards, flagging a row whose other leaderboards may
+    be either player's (one board can't say which Billy Hamilton a .344 average belongs to).
+    """
+    columns = []
+    shared = []
+    for table in tables:
+        table_columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+        stat = primary_stat(table_columns)
+        df = read_sql(
+            f'''SELECT p.player_id, t."{stat}" AS stat, t.rank
+                FROM "{table}" t JOIN player_ids p ON p.spelling = t.name ORDER BY t.rowid''', conn)
+        listed_twice = df['player_id'].duplicated(keep=False)
+        shared.append(df.loc[listed_twice, 'player_id'].drop_duplicates())
+        df = df[~listed_twice].set_index('player_id')
+        columns.append(df['stat'].rename(table))
+        columns.append(df['rank'].astype('Int64').rename(f'{table}_rank'))
+
+    #Display name: the reconciled name of each player (their first spelling, going through the leaderboards in order)
+    name = read_sql('SELECT player_id, name FROM player_ids', conn).drop_duplicates(subset='player_id').set_index('player_id')['name']
+    shared_boards = pd.concat(shared).value_counts().reindex(name.index, fill_value=0).rename('shared_name_leaderboards')
+    profile = pd.concat([name, shared_boards, *columns], axis=1).rename_axis('player_id').reset_index()
+    profile = profile[['name', 'player_id', *profile.columns.drop(['name', 'player_id'])]].sort_values('player_id', ignore_index=True)
+    #Whole-number stats stay integers where a player has no value
+    for col in profile.columns[2:]:
+        if pd.api.types.is_float_dtype(profile[col]) and (profile[col].dropna() % 1 == 0).all():
+            profile[col] = profile[col].astype('Int64')
+
+    write_table(conn, 'player_profile', profile)
+    conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS "ix_player_profile_player_id" ON player_profile (player_id)')
+    conn.commit()
+    print(f"Built 'player_profile' ({len(profile)} players x {len(tables)} leaderboards).")
+
+
+#Settings for building the database as fast as possible
+def tune_for_bulk_load(conn):
+    """Bulk-load pragmas for the build database (safe because a failed build is thrown away, never swapped in)."""
+    #Keep the rollback journal in memory (no WAL or journal files) and don't wait for the disk after each commit
+    conn.execute('PRAGMA journal_mode = MEMORY')
+    conn.execute('PRAGMA synchronous = OFF')
+    #256 MB page cache, temporary b-trees (index builds) in memory, and no other connection needs the file
+    conn.execute('PRAGMA cache_size = -262144')
+    conn.execute('PRAGMA temp_store = MEMORY')
+    conn.execute('PRAGMA locking_mode = EXCLUSIVE')
+
+
+#Put the finished build database in place of the live one
+def swap_into_place(build_path, live_path):
+    """Flush build_path to disk and atomically rename it over live_path."""
+    #synchronous=OFF skipped the fsyncs, so do one before the rename makes the file live
+    with open(build_path, 'rb+') as f:
+        os.fsync(f.fileno())
+    #Readers that already have the old file open keep reading it; new connections get the new one
+    os.replace(build_path, live_path)
+
+
+#Copy tables out of the database into Parquet / Arrow files
+def export_columnar(db_path, tables, changed_tables, directory, file_format):
+    """Write <directory>/<table>.<format> for every table that changed or has no file yet."""
+    extension = columnar_formats[file_format]
+    conn = sqlite3.connect(db_path)
+    written = 0
+    try:
+        for table in tables:
+            if table in changed_tables or not os.path.exists(os.path.join(directory, table + extension)):
+                write_columnar(pd.read_sql(f'SELECT * FROM "{table}"', conn), directory, table, file_format)
+                written += 1
+    finally:
+        conn.close()
+    print(f"Wrote {written} {file_format} file(s) to {directory}/, {len(tables) - written} already current.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load the clean CSVs in csv_clean/ into the SQLite database.")
+    parser.add_argument('--force', action='store_true', help="reload every table, even ones whose csv hasn't changed")
+    parser.add_argument('--from-raw', action='store_true',
+                        help="clean the raw CSVs in csv/ and load them in one pass (no csv_clean/ round trip)")
+    parser.add_argument('--write-clean', action='store_true', help="with --from-raw, also save the clean CSVs to csv_clean/")
+    parser.add_argument('--columnar', choices=sorted(columnar_formats),
+                        help="also write each table as a Parquet or Arrow IPC file for the columnar storage backend")
+    parser.add_argument('--columnar-dir', default=columnar_dir, help=f"folder for the columnar files (default {columnar_dir})")
+    args = parser.parse_args(argv)
+
+    #Player ids handed out by the live database (kept even by a --force rebuild)
+    previous_ids = load_player_ids(db_create)
+
+    #Build into a separate database file so the running dashboard never sees a half-replaced table
+    if os.path.exists(db_build):
+        os.remove(db_build)
+    conn = sqlite3.connect(db_build)
+    try:
+        #Start from a copy of the live database so unchanged tables carry over (unless rebuilding everything)
+        if not args.force and os.path.exists(db_create):
+            live = sqlite3.connect(db_create)
+            live.backup(conn)
+            live.close()
+        tune_for_bulk_load(conn)
+
+        #What was loaded last time (nothing if we're forcing a full rebuild)
+        manifest = {} if args.force else load_manifest(load_manifest_file)
+        new_manifest, changed = import_csvs(conn, manifest, from_raw=args.from_raw, write_clean=args.write_clean)
+
+        #Only rebuild the derived tables and statistics when a leaderboard changed (or they're missing)
+        rebuilt = changed or not set(derived_tables) <= existing_tables(conn)
+        if rebuilt:
+            leaderboards = [entry['table'] for entry in new_manifest.values()]
+            build_leaderboard_categories(conn, new_manifest)
+            #Canonical player ids first (keeping last build's), since the derived tables join on them
+            build_player_ids(conn, leaderboards, previous_ids)
+            #Pre-join and pre-rank the per-player tables so the dashboard only has to look rows up
+            build_hitter_stats(conn)
+            build_pitcher_stats(conn)
+            build_player_profile(conn, leaderboards)
+
+            #Refresh the query planner's statistics for the new tables and indexes
+            conn.execute('ANALYZE')
+            conn.commit()
+    except BaseException:
+        #A failed build is thrown away; the live database is untouched
+        conn.close()
+        os.remove(db_build)
+        raise
+
+    #Close the connection
+    conn.close()
+
+    if rebuilt:
+        swap_into_place(db_build, db_create)
+        #Record what was loaded only once the new database is live
+        save_manifest(load_manifest_file, new_manifest)
+        #Print success message to user
+        print(f"All data imported into {db_create}.")
+    else:
+        #Nothing changed: leave the live database (and the dashboard's cache of it) alone
+        os.remove(db_build)
+        print(f"{db_create} is already up to date.")
+
+    #Columnar copies of the tables that changed (or don't have a copy yet)
+    if args.columnar:
+        changed_tables = {entry['table'] for key, entry in new_manifest.items() if manifest.get(key) != entry}
+        if rebuilt:
+            changed_tables.update(derived_tables)
+        tables = [entry['table'] for entry in new_manifest.values()] + derived_tables
+        export_columnar(db_create, tables, changed_tables, args.columnar_dir, args.columnar)
+
+
+if __name__ == "__main__":
+    main()
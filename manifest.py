@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+
+
+#Fingerprint of a file's contents
+def file_digest(path):
+    """SHA-256 of a file, read in 1 MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+#What the manifest records about one file
+def file_entry(path, df=None):
+    """Hash and size of a file, plus row count and columns of the dataframe read from / written to it."""
+    entry = {
+        'sha256': file_digest(path),
+        'size': os.path.getsize(path),
+    }
+    if df is not None:
+        entry['rows'] = len(df)
+        entry['schema'] = [f"{col}:{dtype}" for col, dtype in df.dtypes.astype(str).items()]
+    return entry
+
+
+#Has the file changed since its entry was recorded?
+def is_unchanged(path, entry):
+    """True if path still exists with the size and hash recorded in entry."""
+    if not entry or not os.path.exists(path):
+        return False
+    #Compare the size first so a changed file usually doesn't need hashing
+    if os.path.getsize(path) != entry.get('size'):
+        return False
+    return file_digest(path) == entry.get('sha256')
+
+
+def load_manifest(path):
+    """Read a manifest JSON file (an empty manifest if it doesn't exist yet)."""
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable manifest {path}: {e}")
+        return {}
+
+
+def save_manifest(path, manifest):
+    """Write a manifest JSON file (replacing the old one in a single rename)."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
@@ -1,9 +1,15 @@
-from time import sleep
+import sys
+from time import perf_counter, sleep
 import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
+from scraper import parse_ba_table
+
+#'batch' pulls the whole table's HTML in one WebDriver call and parses it here;
+#'per-cell' is the original one-call-per-cell extraction (run with --per-cell)
+extraction_mode = 'per-cell' if '--per-cell' in sys.argv else 'batch'
 
 options = webdriver.ChromeOptions()
 options.add_argument('--headless')
@@ -50,33 +56,49 @@ try:
 
         #Find the main data table inside div.ba-table to extract the data
         try:
+            #Time the extraction and count the WebDriver calls (each one is a round trip to the browser)
+            extract_start = perf_counter()
+            round_trips = 0
+
             #Find the necessary nested elements
             table_div = driver.find_element(By.CSS_SELECTOR, 'div.ba-table')
-            table = table_div.find_element(By.TAG_NAME, 'table')
-            rows = table.find_elements(By.TAG_NAME, 'tr')
-
-            #Start off with an empty list for the headers (of the tables since they differ per page) and the data
-            headers = []
-            data = []
-
-            #For every row in the table
-            for row in rows:
-                #Check to see if it has the 'td' tag
-                cols = row.find_elements(By.TAG_NAME, 'td')
-                if not cols:
-                    continue
-                #Run text strip on every cell in the rows of the columns from inside the table cells; put them in a list called cell_texts
-                cell_texts = [col.text.strip() for col in cols]
-                #Grab the class of the rows in the columns to prepare for check if it has the 'banner' class
-                classes = [col.get_attribute("class") for col in cols]
-
-                #If all of the cells in a row have the class of 'banner'
-                if all("banner" in c for c in classes):
-                    #Make it the header row of the csv
-                    headers = cell_texts
-                #If the header rows match the number of cells in a row, append the text of the cells to the data list
-                elif headers and len(cell_texts) == len(headers):
-                    data.append(cell_texts)
+            round_trips += 1
+
+            if extraction_mode == 'batch':
+                #One call for the whole table's HTML, then parse the cells and classes locally
+                headers, data = parse_ba_table(table_div.get_attribute('outerHTML'))
+                round_trips += 1
+            else:
+                table = table_div.find_element(By.TAG_NAME, 'table')
+                rows = table.find_elements(By.TAG_NAME, 'tr')
+                round_trips += 2
+
+                #Start off with an empty list for the headers (of the tables since they differ per page) and the data
+                headers = []
+                data = []
+
+                #For every row in the table
+                for row in rows:
+                    #Check to see if it has the 'td' tag
+                    cols = row.find_elements(By.TAG_NAME, 'td')
+                    round_trips += 1
+                    if not cols:
+                        continue
+                    #Run text strip on every cell in the rows of the columns from inside the table cells; put them in a list called cell_texts
+                    cell_texts = [col.text.strip() for col in cols]
+                    #Grab the class of the rows in the columns to prepare for check if it has the 'banner' class
+                    classes = [col.get_attribute("class") for col in cols]
+                    round_trips += 2 * len(cols)
+
+                    #If all of the cells in a row have the class of 'banner'
+                    if all("banner" in c for c in classes):
+                        #Make it the header row of the csv
+                        headers = cell_texts
+                    #If the header rows match the number of cells in a row, append the text of the cells to the data list
+                    elif headers and len(cell_texts) == len(headers):
+                        data.append(cell_texts)
+
+            print(f"Extracted {url} ({extraction_mode}): {round_trips} WebDriver round-trips in {perf_counter() - extract_start:.2f}s.")
 
             if headers and data:
                 #Create a dataframe with headers on top of the columns
@@ -0,0 +1,91 @@
+import heapq
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+from player_names import normalize_player_key
+
+#How many matches a search hands back (and the player pickers list)
+default_limit = 50
+#Share of the query's trigrams a name needs for a fuzzy (misspelled) match
+min_trigram_share = 0.5
+
+
+#What searches compare: the player key without punctuation ("Ken Griffey Jr." -> "ken griffey jr")
+def search_text(name):
+    return re.sub(r'[^\w ]', '', normalize_player_key(name))
+
+
+def _trigrams(text):
+    padded = f' {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+#Type-ahead search over a list of player names, built once per list
+class NameIndex:
+    """Find players by what's typed so far, without scanning (or sending the browser) every name.
+
+    Matches come in this order: names starting with the query, then names with a later word starting
+    with it (e.g. "aar" finds Hank Aaron), each in the order the names were given; then, to get past
+    typos, names sharing most of the query's trigrams. keys (e.g. player keys) are what search()
+    returns for each name; by default the names themselves.
+    """
+
+    def __init__(self, names, keys=None):
+        self.names = list(names)
+        self.keys = list(keys) if keys is not None else self.names
+        self._names_by_key = dict(zip(self.keys, self.names))
+        texts = [search_text(name) for name in self.names]
+        #Sorted (text from a word onwards, position, word number) so a prefix is one binary search
+        suffixes = sorted(
+            (text[match.start():], position, word)
+            for position, text in enumerate(texts)
+            for word, match in enumerate(re.finditer(r'\S+', text))
+        )
+        self._suffixes = [suffix for suffix, _, _ in suffixes]
+        self._suffix_rows = [(word > 0, position) for _, position, word in suffixes]
+        #Trigram -> positions of the names containing it
+        self._postings = defaultdict(list)
+        for position, text in enumerate(texts):
+            for trigram in _trigrams(text):
+                self._postings[trigram].append(position)
+
+    def __len__(self):
+        return len(self.names)
+
+    def name(self, key):
+        """The name for a key returned by search()."""
+        return self._names_by_key.get(key, key)
+
+    def search(self, query, limit=default_limit):
+        """Keys of up to limit names matching query (the first limit names when query is blank)."""
+        query = search_text(query)
+        if not query:
+            return self.keys[:limit]
+        start = bisect_left(self._suffixes, query)
+        end = bisect_left(self._suffixes, query + '\uffff', start)
+        #Whole-name prefixes first, then later-word prefixes; a name matching both only counts once
+        found = []
+        seen = set()
+        for _, position in sorted(self._suffix_rows[start:end]):
+            if position not in seen:
+                seen.add(position)
+                found.append(position)
+                if len(found) == limit:
+                    break
+        if len(found) < limit:
+            found += self._fuzzy(query, seen, limit - len(found))
+        return [self.keys[position] for position in found]
+
+    def _fuzzy(self, query, seen, limit):
+        """Positions of names sharing at least min_trigram_share of query's trigrams, most shared first."""
+        if len(query) < 3:
+            return []
+        trigrams = _trigrams(query)
+        shared = defaultdict(int)
+        for trigram in trigrams:
+            for position in self._postings.get(trigram, ()):
+                shared[position] += 1
+        needed = min_trigram_share * len(trigrams)
+        scored = [(-count, position) for position, count in shared.items() if count >= needed and position not in seen]
+        return [position for _, position in heapq.nsmallest(limit, scored)]
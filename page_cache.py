@@ -0,0 +1,79 @@
+import hashlib
+import json
+import os
+import time
+
+#Where fetched pages are kept between scraper runs
+cache_dir = '.page_cache'
+#How long a cached page is used without asking the server again (all-time leaderboards change at most once a season)
+default_ttl = 7 * 24 * 60 * 60
+
+
+#On-disk cache of scraped pages
+class PageCache:
+    """Page bodies keyed by URL, with their ETag/Last-Modified and when they were last fetched or revalidated."""
+
+    def __init__(self, directory=cache_dir, ttl=default_ttl):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, name + '.json'), os.path.join(self.directory, name + '.body')
+
+    def lookup(self, url):
+        """The cached entry for url (a dict with 'body' added), or None."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                entry = json.load(f)
+            with open(body_path, 'rb') as f:
+                entry['body'] = f.read()
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def is_fresh(self, entry):
+        """True if the entry is young enough to use without revalidating."""
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def conditional_headers(self, entry):
+        """If-None-Match / If-Modified-Since headers to revalidate an entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, body, headers):
+        """Save a freshly downloaded page; returns True if its body differs from the cached one."""
+        old = self.lookup(url)
+        sha256 = hashlib.sha256(body).hexdigest()
+        #Header names are case-insensitive
+        headers = {name.lower(): value for name, value in headers.items()}
+        entry = {
+            'url': url,
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'fetched_at': time.time(),
+            'sha256': sha256,
+        }
+        meta_path, body_path = self._paths(url)
+        with open(body_path, 'wb') as f:
+            f.write(body)
+        self._write_meta(meta_path, entry)
+        return old is None or old.get('sha256') != sha256
+
+    def revalidated(self, url, entry):
+        """Record that the server said the cached page is still current (HTTP 304)."""
+        entry = {key: value for key, value in entry.items() if key != 'body'}
+        entry['fetched_at'] = time.time()
+        self._write_meta(self._paths(url)[0], entry)
+
+    def _write_meta(self, meta_path, entry):
+        tmp_path = meta_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, meta_path)
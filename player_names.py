@@ -0,0 +1,72 @@
+import re
+import unicodedata
+
+#Accent marks left over after splitting accented letters apart (e.g. "é" -> "e" + "´")
+_combining_marks = '[\u0300-\u036f]'
+
+
+#Normalize one player name into the key used for lookups and joins
+def normalize_player_key(name):
+    """Lowercase name with accents removed and whitespace collapsed ("  Adrián  BELTRÉ " -> "adrian beltre")."""
+    name = unicodedata.normalize('NFKD', str(name))
+    name = re.sub(_combining_marks, '', name)
+    return ' '.join(name.lower().split())
+
+
+#Same as normalize_player_key, for a whole pandas column at once
+def normalize_player_keys(names):
+    """Vectorized normalize_player_key for a Series of names."""
+    return (
+        names.astype(str)
+        .str.normalize('NFKD')
+        .str.replace(_combining_marks, '', regex=True)
+        .str.lower()
+        .str.split()
+        .str.join(' ')
+    )
+
+
+
+#Player keys for one leaderboard's names, never giving two different spellings on it the same key
+def distinct_player_keys(names):
+    """normalize_player_keys, except that names sharing a key with another spelling on the same leaderboard
+    keep their accents ("Jose Cruz" and "José Cruz", father and son, -> "jose cruz" and "josé cruz")."""
+    keys = normalize_player_keys(names)
+    spellings = names.astype(str).str.split().str.join(' ').str.lower()
+    clash = spellings.groupby(keys).transform('nunique') > 1
+    return keys.mask(clash, spellings)
+
+#Generational suffixes that tell a father and son apart (Ken Griffey / Ken Griffey Jr.)
+name_suffixes = {'jr', 'sr', 'ii', 'iii', 'iv'}
+
+
+#Undo UTF-8 text that was decoded as Windows-1252 ("AdriÃ¡n BeltrÃ©" -> "Adrián Beltré")
+def repair_mojibake(name):
+    name = str(name)
+    for encoding in ('cp1252', 'latin-1'):
+        try:
+            return name.encode(encoding).decode('utf-8')
+        except UnicodeError:
+            continue
+    return name
+
+
+#How a name is compared when reconciling spellings across leaderboards
+def match_parts(name):
+    """(given names, surname, suffix) with mojibake repaired, accents and punctuation dropped and runs of
+    initials joined: "J. D. Drew" and "JD Drew" -> ("jd", "drew", ""); "Cal Ripken Jr." -> ("cal", "ripken", "jr")."""
+    name = normalize_player_key(repair_mojibake(name))
+    name = re.sub(r"[.,]", ' ', re.sub(r"['’]", '', name.replace('-', ' ')))
+    words = []
+    initials = False
+    for word in name.split():
+        #Single letters in a row are initials: "j d" -> "jd"
+        if len(word) == 1 and initials:
+            words[-1] += word
+        else:
+            words.append(word)
+            initials = len(word) == 1
+    suffix = words.pop() if len(words) > 2 and words[-1] in name_suffixes else ''
+    if not words:
+        return '', '', suffix
+    return ' '.join(words[:-1]), words[-1], suffix
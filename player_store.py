@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+
+#Text columns that hold player names / keys (interned once across every table in the store)
+name_columns = ['name', 'player_key']
+
+
+#Smallest dtype that holds a numeric column exactly
+def _narrow(series):
+    #Whole numbers (even with missing values) become the smallest integer type that fits
+    values = series.dropna()
+    if pd.api.types.is_float_dtype(series) and (values % 1 == 0).all():
+        if series.isna().any():
+            series = series.astype('Int64')
+        else:
+            series = series.astype('int64')
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+    #Floats only drop to float32 when every value survives the round trip unchanged
+    if pd.api.types.is_float_dtype(series):
+        as_float32 = series.astype('float32')
+        if ((as_float32.astype('float64') == series) | series.isna()).all():
+            return as_float32
+    return series
+
+
+def _memory(df):
+    """Bytes used by df; categorical columns count only their codes (the shared categories are counted once, separately)."""
+    total = int(df.index.memory_usage(deep=True))
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            total += int(df[col].cat.codes.nbytes)
+        else:
+            total += int(df[col].memory_usage(index=False, deep=True))
+    return total
+
+
+#Bytes held by a categorical's category values (Index.memory_usage would also count its hash table)
+def _categories_memory(dtype):
+    return int(pd.Series(dtype.categories).memory_usage(index=False, deep=True))
+
+
+#Shared, read-only dataframes for the dashboard
+class PlayerStore:
+    """Memory-compact copies of the dashboard tables: player names interned once as categoricals, stats narrowed."""
+
+    def __init__(self, tables):
+        #One category list per name column, shared by every table (each distinct name is stored once)
+        self.name_dtypes = {}
+        for col in name_columns:
+            values = pd.concat([df[col] for df in tables.values() if col in df.columns], ignore_index=True)
+            self.name_dtypes[col] = pd.CategoricalDtype(sorted(values.dropna().astype(str).unique()))
+
+        self._tables = {}
+        self._positions = {}
+        self._report = []
+        for table_name, df in tables.items():
+            before = _memory(df)
+            compact = pd.DataFrame(index=df.index)
+            for col in df.columns:
+                if col in self.name_dtypes:
+                    compact[col] = df[col].astype(self.name_dtypes[col])
+                elif pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+                    compact[col] = _narrow(df[col])
+                else:
+                    compact[col] = df[col]
+            self._tables[table_name] = compact
+            #Name -> row position, built once so looking a player up doesn't scan the column
+            #(reversed so a repeated name keeps its first row, like the old boolean masks did)
+            if 'name' in compact.columns:
+                self._positions[table_name] = {name: pos for pos, name in reversed(list(enumerate(compact['name'])))}
+            after = _memory(compact)
+            self._report.append({'table': table_name, 'rows': len(df), 'bytes_before': before, 'bytes_after': after})
+
+        self._report.append({
+            'table': '(shared names)',
+            'rows': sum(len(dtype.categories) for dtype in self.name_dtypes.values()),
+            'bytes_before': 0,
+            'bytes_after': sum(_categories_memory(dtype) for dtype in self.name_dtypes.values()),
+        })
+
+    def table(self, table_name):
+        """A table from the store (a shallow copy: adding or replacing columns won't touch the shared frame)."""
+        return self._tables[table_name].copy(deep=False)
+
+    def position(self, table_name, name):
+        """Row position of a player in a table, or None if they aren't in it."""
+        return self._positions[table_name].get(name)
+
+    def memory_report(self):
+        """Bytes per table before and after compaction (plus the shared name categories)."""
+        report = pd.DataFrame(self._report)
+        total = report[['rows', 'bytes_before', 'bytes_after']].sum()
+        report.loc[len(report)] = {'table': 'total', **total.to_dict()}
+        #Share of the original bytes saved (blank for the shared names, which had no 'before')
+        report['saved'] = 1 - report['bytes_after'] / report['bytes_before'].replace(0, np.nan)
+        return report
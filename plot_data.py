@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+
+#The numbers a box plot draws, so the browser doesn't have to be sent every value
+def box_stats(values):
+    """Quartiles, whisker ends and outliers of values, computed the way Plotly does (1.5 x IQR whiskers)."""
+    values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().to_numpy(dtype='float64')
+    #Plotly's default 'linear' quartiles interpolate at n * p - 0.5, which is NumPy's 'hazen' method
+    q1, median, q3 = np.percentile(values, [25, 50, 75], method='hazen')
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        #Whiskers end at the furthest values still within 1.5 x IQR of the box
+        'lowerfence': inside.min(),
+        'upperfence': inside.max(),
+        'outliers': np.sort(values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)]),
+        'count': len(values),
+    }
+
+
+def box_traces(stats, name, color='white'):
+    """A precomputed box plus its outliers as WebGL points (what go.Box(y=..., boxpoints='outliers') would draw)."""
+    box = go.Box(
+        x=[name],
+        q1=[stats['q1']],
+        median=[stats['median']],
+        q3=[stats['q3']],
+        lowerfence=[stats['lowerfence']],
+        upperfence=[stats['upperfence']],
+        name=name,
+        marker_color=color,
+        hoverinfo='skip',
+    )
+    outliers = go.Scattergl(
+        x=[name] * len(stats['outliers']),
+        y=stats['outliers'],
+        mode='markers',
+        marker=dict(color=color, size=6),
+        showlegend=False,
+        hoverinfo='skip',
+    )
+    return [box, outliers]
+
+
+#Hover labels for every point of a scatter, built once with vectorized string operations
+def hover_text(names, fields):
+    """'<name><br><label>: <value>...' for each row; fields is a list of (label, values) pairs."""
+    text = pd.Series(names).astype(str).reset_index(drop=True)
+    for label, values in fields:
+        text = text + f'<br>{label}: ' + pd.Series(values).astype(str).reset_index(drop=True)
+    return text.to_numpy()
@@ -0,0 +1,62 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+#Queries slower than this (milliseconds) get their plan appended to the slow query log
+slow_query_ms = float(os.environ.get('MLB_SLOW_QUERY_MS', 100))
+#JSON Lines file of slow queries (one object per query)
+slow_query_log = os.environ.get('MLB_SLOW_QUERY_LOG', 'slow_queries.jsonl')
+
+_log_lock = threading.Lock()
+#The latest query records of this process (newest last)
+recent_queries = deque(maxlen=100)
+
+
+#How SQLite will run a query, without running it
+def explain(conn, query, params=()):
+    """The EXPLAIN QUERY PLAN detail lines for query (empty if it can't be explained)."""
+    try:
+        return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {query}', params)]
+    except Exception:
+        return []
+
+
+def full_scans(plan):
+    """Plan lines that read a whole table ('SCAN t', not 'SCAN t USING INDEX ...' or a SEARCH)."""
+    return [line for line in plan if line.startswith('SCAN ') and ' USING ' not in line]
+
+
+#Record one query's timing (and its plan when asked for or when it was slow)
+def record_query(conn, query, seconds, rows, source, params=(), with_plan=False):
+    """Return a dict with the query, source, wall time, rows and (if with_plan or slow) its plan and full scans.
+
+    Every record is kept in recent_queries; slow ones (at least slow_query_ms) are also appended to slow_query_log.
+    """
+    record = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'source': source,
+        'query': ' '.join(query.split()),
+        'ms': round(seconds * 1000, 3),
+        'rows': rows,
+    }
+    slow = record['ms'] >= slow_query_ms
+    if with_plan or slow:
+        record['plan'] = explain(conn, query, params)
+        record['full_scans'] = full_scans(record['plan'])
+    recent_queries.append(record)
+    if slow:
+        with _log_lock, open(slow_query_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+    return record
+
+
+@contextmanager
+def timed_query(conn, query, source, params=(), with_plan=False):
+    """Time the block that runs query; the block sets record['rows'], and record is filled in when it ends."""
+    record = {'rows': None}
+    start = time.perf_counter()
+    yield record
+    record.update(record_query(conn, query, time.perf_counter() - start, record['rows'], source, params, with_plan))
@@ -0,0 +1,97 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+
+#One metric's values, sorted once so ranks and percentiles are binary searches
+class SortedMetric:
+    """Rank and percentile lookups for one numeric column (missing values are left out).
+
+    Ties are handled the same way everywhere: a player's rank is 1 + the number of strictly better
+    values (tied players share a rank), and their percentile is the percent of values strictly worse.
+    Every method takes a single value or an array of values.
+    """
+
+    def __init__(self, values):
+        values = pd.to_numeric(pd.Series(values), errors='coerce').dropna()
+        order = np.argsort(values.to_numpy(dtype='float64'), kind='stable')
+        self.values = values.to_numpy(dtype='float64')[order]
+        #Index labels of the values in ascending order (tied values keep their original order)
+        self.order = values.index.to_numpy()[order]
+
+    def __len__(self):
+        return len(self.values)
+
+    def ranked(self, higher_is_better=True):
+        """Index labels from best to worst value (tied values keep their original order)."""
+        if not higher_is_better:
+            return self.order
+        #Not order[::-1], which would put ties in reverse order
+        return self.order[np.argsort(-self.values, kind='stable')]
+
+    def count_below(self, value):
+        """How many values are strictly less than value."""
+        return np.searchsorted(self.values, value, side='left')
+
+    def count_above(self, value):
+        """How many values are strictly greater than value."""
+        return len(self.values) - np.searchsorted(self.values, value, side='right')
+
+    def rank(self, value, higher_is_better=True):
+        """1-based rank of value (1 is the best)."""
+        better = self.count_above(value) if higher_is_better else self.count_below(value)
+        return better + 1
+
+    def percentile(self, value, higher_is_better=True):
+        """Percent of values strictly worse than value, rounded to one decimal."""
+        if not len(self.values):
+            return np.nan
+        worse = self.count_below(value) if higher_is_better else self.count_above(value)
+        return np.round(100 * (worse / len(self.values)), 1)
+
+
+#Ranks and percentiles for every numeric column of every table
+class RankEngine:
+    """Build a SortedMetric for a (table, column) the first time it's asked for and keep it.
+
+    read_table(table) loads a table as a dataframe (e.g. a storage backend's read_table).
+    """
+
+    def __init__(self, read_table, table_names):
+        self._read_table = read_table
+        self.table_names = list(table_names)
+        self._frames = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _frame(self, table):
+        if table not in self._frames:
+            if table not in self.table_names:
+                raise KeyError(f"Unknown table '{table}'")
+            self._frames[table] = self._read_table(table)
+        return self._frames[table]
+
+    def numeric_columns(self, table):
+        """Columns of a table that can be ranked."""
+        df = self._frame(table)
+        return [col for col in df.columns
+                if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col])]
+
+    def metric(self, table, column):
+        """The sorted values of table.column."""
+        with self._lock:
+            key = (table, column)
+            if key not in self._metrics:
+                if column not in self.numeric_columns(table):
+                    raise KeyError(f"'{column}' is not a numeric column of '{table}'")
+                self._metrics[key] = SortedMetric(self._frame(table)[column])
+            return self._metrics[key]
+
+    def rank(self, table, column, value, higher_is_better=True):
+        """Rank of value among table.column (1 is the best)."""
+        return self.metric(table, column).rank(value, higher_is_better)
+
+    def percentile(self, table, column, value, higher_is_better=True):
+        """Percent of table.column strictly worse than value."""
+        return self.metric(table, column).percentile(value, higher_is_better)
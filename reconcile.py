@@ -0,0 +1,145 @@
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+import pandas as pd
+
+from player_names import match_parts, repair_mojibake
+
+#How alike the given names of two spellings in one block must be to be offered as a possible match (difflib ratio, 0-1)
+min_given_name_similarity = 0.85
+
+
+#Groups of spellings that are one player
+class _Clusters:
+    """Union-find over spellings that also tracks which leaderboards each group appears on.
+
+    Two groups on the same leaderboard are never merged: a leaderboard lists a player once, so
+    different spellings side by side on one page are different people.
+    """
+
+    def __init__(self, tables):
+        self.parent = list(range(len(tables)))
+        self.tables = [set(t) for t in tables]
+
+    def find(self, i):
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def conflict(self, i, j):
+        """True if the groups of i and j share a leaderboard."""
+        return bool(self.tables[self.find(i)] & self.tables[self.find(j)])
+
+    def union(self, i, j):
+        """Merge the groups of i and j (the earlier one is kept as the root); False if they can't be merged."""
+        i, j = sorted((self.find(i), self.find(j)))
+        if i == j:
+            return True
+        if self.tables[i] & self.tables[j]:
+            return False
+        self.parent[j] = i
+        self.tables[i] |= self.tables[j]
+        return True
+
+    def union_all(self, members):
+        """Merge members into one group, unless two of their groups share a leaderboard (then none are merged:
+        with "Jose Cruz" and "José Cruz" both on a page, there's no telling which one a third spelling is)."""
+        roots = list({self.find(i): None for i in members})
+        if any(self.conflict(a, b) for n, a in enumerate(roots) for b in roots[n + 1:]):
+            return False
+        for root in roots[1:]:
+            self.union(roots[0], root)
+        return True
+
+
+#Give every spelling of a player the same id
+def reconcile_players(spellings, previous=None, confirmed=()):
+    """Assign a canonical player_id to every spelling of a name on the leaderboards.
+
+    spellings is a dataframe of (name, table) rows in leaderboard order; a player's first spelling
+    becomes their display name (with any mojibake repaired). Spellings are grouped, never across two
+    groups on the same leaderboard, when they:
+    1. are the same once mojibake is repaired and case and spacing are ignored ("JosÃ© Cruz" / "José Cruz"),
+    2. have equal match_parts (accents, punctuation and initials ignored), as long as that doesn't leave a
+       spelling between two players, or
+    3. are listed together in confirmed, pairs of spellings a person has checked are one player.
+    A Jr. is never matched to a name without one (Ken Griffey and Ken Griffey Jr. are father and son).
+
+    Close given names (min_given_name_similarity) within a block of the same surname, first initial and
+    suffix are not merged on their own: a similar name alone isn't enough to say two players are one
+    (Charley Jones of the 1880s and Charlie Jones of the 1900s are likely two). Only spellings in a block are
+    compared rather than every pair of players, and the pairs not yet confirmed are handed back for review.
+
+    previous ({spelling: player_id}, e.g. from the last build) keeps ids stable: a group reuses an id
+    one of its spellings had before, and new players get ids after the largest one used so far.
+    Returns (a dataframe of spelling, player_id and name with one row per spelling,
+    [(spelling, spelling, similarity), ...] possible matches still to confirm).
+    """
+    previous = previous or {}
+    #Each spelling's leaderboards, in the order the spellings first appear
+    tables = {}
+    for name, table in zip(spellings['name'], spellings['table']):
+        tables.setdefault(name, set()).add(table)
+    names = list(tables)
+    clusters = _Clusters(list(tables.values()))
+
+    #The same spelling, apart from mojibake, case and spacing
+    same_spelling = defaultdict(list)
+    for i, name in enumerate(names):
+        same_spelling[' '.join(repair_mojibake(name).lower().split())].append(i)
+    for members in same_spelling.values():
+        clusters.union_all(members)
+
+    #The same name once accents, punctuation and initials are dealt with
+    parts = [match_parts(name) for name in names]
+    same_parts = defaultdict(list)
+    for i, key in enumerate(parts):
+        same_parts[key].append(i)
+    for members in same_parts.values():
+        clusters.union_all(members)
+
+    #Pairs someone has confirmed are one player
+    position = {name: i for i, name in enumerate(names)}
+    for a, b in confirmed:
+        if a in position and b in position:
+            clusters.union(position[a], position[b])
+
+    #Close given names within a block of surname + first initial + suffix (e.g. "Rickey" / "Ricky" Henderson)
+    blocks = defaultdict(list)
+    for (given, surname, suffix), members in same_parts.items():
+        if surname:
+            blocks[(surname, given[:1], suffix)].append(members[0])
+    candidates = []
+    for members in blocks.values():
+        for a in range(len(members)):
+            for b in range(a + 1, len(members)):
+                i, j = members[a], members[b]
+                similarity = SequenceMatcher(None, parts[i][0], parts[j][0]).ratio()
+                #Skip pairs already one player, or on the same leaderboard (which can't be)
+                if similarity >= min_given_name_similarity and not clusters.conflict(i, j) and clusters.find(i) != clusters.find(j):
+                    candidates.append((names[i], names[j], round(similarity, 3)))
+
+    #Stable ids: reuse the id a group's spellings had last time (the most common one) if no earlier group took it
+    roots = [clusters.find(i) for i in range(len(names))]
+    members = defaultdict(list)
+    for i, root in enumerate(roots):
+        members[root].append(i)
+    next_id = max(previous.values(), default=0) + 1
+    taken = set()
+    ids = {}
+    for root, group in members.items():
+        old = Counter(previous[names[i]] for i in group if names[i] in previous)
+        reused = next((player_id for player_id, _ in old.most_common() if player_id not in taken), None)
+        if reused is None:
+            reused = next_id
+            next_id += 1
+        taken.add(reused)
+        ids[root] = reused
+
+    ids = pd.DataFrame({
+        'spelling': names,
+        'player_id': [ids[root] for root in roots],
+        'name': [repair_mojibake(names[root]) for root in roots],
+    })
+    return ids, candidates
@@ -0,0 +1,324 @@
+import argparse
+import asyncio
+import http.client
+import os
+import queue
+import time
+from html.parser import HTMLParser
+from urllib.parse import urljoin, urlsplit
+
+import pandas as pd
+from page_cache import PageCache, cache_dir, default_ttl
+
+#Set up the URLS to be scraped
+base_url = "https://www.baseball-almanac.com/"
+#Menu page and career-page folder for each leaderboard category
+menus = {
+    'hitting': "himenu.shtml",
+    'pitching': "pimenu.shtml",
+}
+user_agent = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+
+#Pull the leaderboard table out of a page's HTML
+class BaTableParser(HTMLParser):
+    """Collect the cell texts and classes of every row of the first table inside div.ba-table."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        #Each row is a list of (text, class) cells
+        self.rows = []
+        self._in_ba_div = False
+        #Nesting depth inside the leaderboard table (0 = not in it)
+        self._table_depth = 0
+        self._done = False
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._done:
+            return
+        attrs = dict(attrs)
+        if tag == 'div' and 'ba-table' in (attrs.get('class') or '').split():
+            self._in_ba_div = True
+        elif tag == 'table' and (self._in_ba_div or self._table_depth):
+            self._table_depth += 1
+        elif self._table_depth and tag == 'tr':
+            self.rows.append([])
+        elif self._table_depth and tag == 'td' and self.rows:
+            self._cell = ([], attrs.get('class') or '')
+        elif self._cell is not None and tag == 'br':
+            self._cell[0].append(' ')
+
+    def handle_endtag(self, tag):
+        if self._done:
+            return
+        if tag == 'td' and self._cell is not None:
+            text, css_class = self._cell
+            #Collapse whitespace the way a browser renders the cell's text
+            self.rows[-1].append((' '.join(''.join(text).split()), css_class))
+            self._cell = None
+        elif tag == 'table' and self._table_depth:
+            self._table_depth -= 1
+            if not self._table_depth:
+                self._done = True
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell[0].append(data)
+
+
+#Turn a ba-table into headers and data rows
+def parse_ba_table(html):
+    """Return (headers, data) from the page's div.ba-table table (the same rules as the Selenium scrapers)."""
+    parser = BaTableParser()
+    parser.feed(html)
+    parser.close()
+
+    headers = []
+    data = []
+    for row in parser.rows:
+        if not row:
+            continue
+        cell_texts = [text for text, _ in row]
+        classes = [css_class for _, css_class in row]
+        #If all of the cells in a row have the class of 'banner', make it the header row of the csv
+        if all("banner" in c for c in classes):
+            headers = cell_texts
+        #If the header rows match the number of cells in a row, append the text of the cells to the data list
+        elif headers and len(cell_texts) == len(headers):
+            data.append(cell_texts)
+    return headers, data
+
+
+#Find the links and the title on a page
+class _LinkParser(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        #(href, link text) for every <a>
+        self.links = []
+        self.title = ''
+        self._href = None
+        self._text = []
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self._href = dict(attrs).get('href')
+            self._text = []
+        elif tag == 'title':
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag == 'a' and self._href is not None:
+            self.links.append((self._href, ''.join(self._text)))
+            self._href = None
+        elif tag == 'title':
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+        if self._in_title:
+            self.title += data
+
+
+def career_links(html, page_url, category):
+    """Absolute URLs of the 'career' links on a menu page that point into base_url/<category>/."""
+    parser = _LinkParser()
+    parser.feed(html)
+    site = urljoin(page_url, '/')
+    links = []
+    for href, text in parser.links:
+        #Look for the links that literally have 'career'
+        if href and text.strip().lower() == 'career':
+            url = urljoin(page_url, href)
+            if url.startswith(site + category + "/") and url not in links:
+                links.append(url)
+    return links
+
+
+def page_title(html):
+    """The page title before the first '|', made safe for a file name."""
+    parser = _LinkParser()
+    parser.feed(html)
+    title = ' '.join(parser.title.split())
+    return title.split("|")[0].strip().replace(" ", "_").replace("/", "_")
+
+
+#Keep-alive HTTP connections to one site, shared by the fetch threads
+class ConnectionPool:
+    """Up to `size` reusable HTTP(S) connections to the host of site_url."""
+
+    def __init__(self, site_url, size, timeout=30):
+        parts = urlsplit(site_url)
+        self.scheme = parts.scheme
+        self.host = parts.netloc
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._slots = asyncio.Semaphore(size)
+        self.requests = 0
+        self.connections_opened = 0
+
+    def _new_connection(self):
+        self.connections_opened += 1
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        return connection_class(self.host, timeout=self.timeout)
+
+    def _request(self, path, headers):
+        """Blocking GET on an idle (or new) connection; returns (status, headers, body)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection()
+        #A kept-alive connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            try:
+                conn.request('GET', path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                if attempt:
+                    raise
+                conn = self._new_connection()
+        self.requests += 1
+        if response.will_close:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        return response.status, dict(response.getheaders()), body
+
+    async def get(self, url, headers=None):
+        """GET url (which must be on this pool's host) from a worker thread."""
+        parts = urlsplit(url)
+        if parts.netloc != self.host:
+            raise ValueError(f"{url} is not on {self.host}")
+        path = parts.path + (f"?{parts.query}" if parts.query else '')
+        headers = {'User-Agent': user_agent, **(headers or {})}
+        async with self._slots:
+            return await asyncio.to_thread(self._request, path, headers)
+
+    def close(self):
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+#Politeness: space out the start of requests to the site
+class RateLimiter:
+    """Allow at most `per_second` request starts per second."""
+
+    def __init__(self, per_second):
+        self.interval = 1 / per_second if per_second > 0 else 0
+        self._next_start = 0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next_start - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = max(loop.time(), self._next_start) + self.interval
+
+
+#Download one page politely (or reuse the cached copy)
+async def fetch(pool, limiter, url, cache=None):
+    """Return (body as text, changed): changed is False when the cached copy was still current."""
+    entry = cache.lookup(url) if cache else None
+    #Young enough to use without asking the server at all
+    if entry and cache.is_fresh(entry):
+        return entry['body'].decode('utf-8', errors='replace'), False
+
+    await limiter.wait()
+    status, headers, body = await pool.get(url, cache.conditional_headers(entry) if entry else None)
+    #The server says our copy is still current, so nothing was transferred
+    if status == 304 and entry:
+        cache.revalidated(url, entry)
+        return entry['body'].decode('utf-8', errors='replace'), False
+    if status != 200:
+        raise RuntimeError(f"HTTP {status} for {url}")
+    changed = cache.store(url, body, headers) if cache else True
+    return body.decode('utf-8', errors='replace'), changed
+
+
+#Scrape one career page into a csv
+async def scrape_page(pool, limiter, url, out_dir, cache=None):
+    """Fetch a career page and save its table as <page title>.csv; returns (one-line status, csv changed)."""
+    try:
+        html, changed = await fetch(pool, limiter, url, cache)
+        file_path = os.path.join(out_dir, f"{page_title(html)}.csv")
+        #Unchanged page and its csv is already there: skip parsing, and leave the csv alone so cleaning/loading skip it too
+        if not changed and os.path.exists(file_path):
+            return f"Unchanged: {url}", False
+        #The HTML parsing is plain CPU work, so it runs right here instead of through a browser
+        headers, data = parse_ba_table(html)
+        if not (headers and data):
+            return f"No valid data found on: {url}", False
+        #Create a dataframe with headers on top of the columns, named after the page
+        csv_text = pd.DataFrame(data, columns=headers).to_csv(index=False)
+        #A changed page can still have the same table (e.g. new ads); only rewrite the csv if it differs
+        if os.path.exists(file_path):
+            with open(file_path, encoding='utf-8', newline='') as f:
+                if f.read() == csv_text:
+                    return f"Table unchanged: {url}", False
+        with open(file_path, 'w', encoding='utf-8', newline='') as f:
+            f.write(csv_text)
+        return f"Saved {file_path} with {len(data)} rows.", True
+    except Exception as e:
+        return f"Error parsing table at {url}: {e}", False
+
+
+async def scrape_category(category, site_url=base_url, out_dir=None, concurrency=4, rate=4.0, cache=None):
+    """Scrape every career page linked from a category's menu page into out_dir (default csv/<category>).
+
+    Returns how many csv files were written or changed.
+    """
+    out_dir = out_dir or os.path.join('csv', category)
+    os.makedirs(out_dir, exist_ok=True)
+    pool = ConnectionPool(site_url, concurrency)
+    limiter = RateLimiter(rate)
+    start = time.perf_counter()
+    try:
+        menu_url = urljoin(site_url, menus[category])
+        menu_html, _ = await fetch(pool, limiter, menu_url, cache)
+        links = career_links(menu_html, menu_url, category)
+        #How many links were found
+        print(f"Found {len(links)} {category} career pages.")
+        #gather keeps the results in link order, whatever order the pages finish in
+        results = await asyncio.gather(*(scrape_page(pool, limiter, url, out_dir, cache) for url in links))
+        for message, _ in results:
+            print(message)
+    finally:
+        pool.close()
+    changed = sum(csv_changed for _, csv_changed in results)
+    print(f"{category}: {changed} csv(s) changed; {pool.requests} requests over {pool.connections_opened} connection(s) "
+          f"in {time.perf_counter() - start:.1f}s.")
+    return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Baseball Almanac career leaderboards into CSVs.")
+    parser.add_argument('category', choices=[*menus, 'all'], help="which menu to scrape")
+    parser.add_argument('--base-url', default=base_url, help="site to scrape (e.g. a local server with saved pages)")
+    parser.add_argument('--out-dir', help="where to save the CSVs (default csv/<category>)")
+    parser.add_argument('--concurrency', type=int, default=4, help="simultaneous connections (default 4)")
+    parser.add_argument('--rate', type=float, default=4.0, help="maximum requests started per second (default 4)")
+    parser.add_argument('--cache-dir', default=cache_dir, help=f"page cache folder (default {cache_dir})")
+    parser.add_argument('--ttl', type=float, default=default_ttl / 3600,
+                        help=f"hours a cached page is used without revalidating (default {default_ttl // 3600})")
+    parser.add_argument('--no-cache', action='store_true', help="always download every page")
+    args = parser.parse_args(argv)
+
+    cache = None if args.no_cache else PageCache(args.cache_dir, args.ttl * 3600)
+    categories = list(menus) if args.category == 'all' else [args.category]
+    changed = 0
+    for category in categories:
+        changed += asyncio.run(scrape_category(category, args.base_url, args.out_dir, args.concurrency, args.rate, cache))
+    #Nothing new means cleaning and loading have nothing to do
+    if not changed:
+        print("No leaderboard changed; cleaning_data.py and loading_into_dataframe.py can be skipped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import os
+import pandas as pd
+
+from connection_pool import get_pool
+from manifest import file_digest
+from query_log import timed_query
+
+#Database the dashboard reads from by default
+mlb_db = 'mlb_hit_pitch_stats.db'
+#Folder the loader writes Parquet / Arrow copies of the tables to (loading_into_dataframe.py --columnar ...)
+columnar_dir = 'columnar'
+#File extension for each columnar format
+columnar_formats = {
+    'parquet': '.parquet',
+    'arrow': '.arrow',
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("The Parquet/Arrow storage needs pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+#SQLite column type for an Arrow type (matching what the loader declares)
+def _arrow_sql_type(arrow_type):
+    import pyarrow.types as pat
+    if pat.is_integer(arrow_type) or pat.is_boolean(arrow_type):
+        return 'INTEGER'
+    if pat.is_floating(arrow_type):
+        return 'REAL'
+    return 'TEXT'
+
+
+#Row-oriented tables in the SQLite database
+class SQLiteStorage:
+    """Read tables from the SQLite database, through a pool of read-only connections."""
+
+    def __init__(self, db_path=mlb_db):
+        self.path = db_path
+        self.pool = get_pool(db_path)
+
+    def signature(self):
+        """Cheap change check: modified time and size of the database file."""
+        stat = os.stat(self.path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def digest(self):
+        """Content hash of the database file."""
+        return file_digest(self.path)
+
+    def tables(self):
+        """Names of the tables in the database (not SQLite's own statistics tables)."""
+        with self.pool.connection() as conn:
+            return [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+
+    def schema(self):
+        """Column names and declared types of every table, from a single query: {table: [(column, type), ...]}."""
+        with self.pool.connection() as conn:
+            rows = conn.execute(
+                """SELECT m.name, p.name, p.type FROM sqlite_master m JOIN pragma_table_info(m.name) p
+                   WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite_%' ORDER BY m.name, p.cid""").fetchall()
+        schema = {}
+        for table, column, column_type in rows:
+            schema.setdefault(table, []).append((column, column_type))
+        return schema
+
+    def _read_sql(self, query, params=()):
+        """Run a query into a dataframe, timing it (and logging it if slow) through query_log."""
+        with self.pool.connection() as conn, timed_query(conn, query, 'storage', params) as record:
+            df = pd.read_sql(query, conn, params=params)
+            record['rows'] = len(df)
+        return df
+
+    def read_table(self, table, columns=None):
+        """A table (or just some of its columns) as a dataframe."""
+        select = ', '.join(f'"{col}"' for col in columns) if columns else '*'
+        return self._read_sql(f'SELECT {select} FROM "{table}"')
+
+    def read_rows(self, table, column, value):
+        """The rows of a table where column == value (an indexed lookup when the column is indexed)."""
+        return self._read_sql(f'SELECT * FROM "{table}" WHERE "{column}" = ?', (value,))
+
+
+#One Parquet or Arrow IPC file per table
+class ColumnarStorage:
+    """Read tables from <directory>/<table>.parquet or .arrow files, only loading the requested columns."""
+
+    def __init__(self, directory=columnar_dir, file_format='parquet'):
+        self.path = directory
+        self.format = file_format
+        self.extension = columnar_formats[file_format]
+        _require_pyarrow()
+
+    def _files(self):
+        return sorted(name for name in os.listdir(self.path) if name.endswith(self.extension))
+
+    def signature(self):
+        """Cheap change check: the folder's modified time plus each file's name, modified time and size."""
+        files = []
+        for name in self._files():
+            stat = os.stat(os.path.join(self.path, name))
+            files.append((name, stat.st_mtime_ns, stat.st_size))
+        return (os.stat(self.path).st_mtime_ns, tuple(files))
+
+    def digest(self):
+        """Content hash over every table file in the folder."""
+        digest = hashlib.sha256()
+        for name in self._files():
+            digest.update(name.encode('utf-8'))
+            digest.update(file_digest(os.path.join(self.path, name)).encode('ascii'))
+        return digest.hexdigest()
+
+    def tables(self):
+        """Names of the tables in the folder."""
+        return sorted(name[:-len(self.extension)] for name in self._files())
+
+    def schema(self):
+        """Column names and SQLite-style types (INTEGER, REAL, TEXT) of every table, read from the file footers only."""
+        pyarrow = _require_pyarrow()
+        schema = {}
+        for table in self.tables():
+            path = os.path.join(self.path, table + self.extension)
+            if self.format == 'parquet':
+                import pyarrow.parquet as pq
+                arrow_schema = pq.read_schema(path, memory_map=True)
+            else:
+                import pyarrow.ipc
+                arrow_schema = pyarrow.ipc.open_file(pyarrow.memory_map(path)).schema
+            schema[table] = [(field.name, _arrow_sql_type(field.type)) for field in arrow_schema]
+        return schema
+
+    def read_table(self, table, columns=None):
+        """A table (or just some of its columns) as a dataframe, memory-mapping the file."""
+        pyarrow = _require_pyarrow()
+        path = os.path.join(self.path, table + self.extension)
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            arrow_table = pq.read_table(path, columns=columns, memory_map=True)
+        else:
+            import pyarrow.ipc
+            #Arrow IPC files are read straight from the mapped pages, without copying the columns
+            #(the mapping stays open for as long as the table's buffers use it)
+            arrow_table = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+            if columns:
+                arrow_table = arrow_table.select(columns)
+        return arrow_table.to_pandas()
+
+    def read_rows(self, table, column, value):
+        """The rows of a table where column == value (Parquet skips row groups whose statistics rule the value out)."""
+        pyarrow = _require_pyarrow()
+        path = os.path.join(self.path, table + self.extension)
+        if self.format == 'parquet':
+            import pyarrow.parquet as pq
+            arrow_table = pq.read_table(path, filters=[(column, '==', value)], memory_map=True)
+        else:
+            import pyarrow.compute as pc
+            import pyarrow.ipc
+            arrow_table = pyarrow.ipc.open_file(pyarrow.memory_map(path)).read_all()
+            arrow_table = arrow_table.filter(pc.equal(arrow_table[column], value))
+        return arrow_table.to_pandas()
+
+
+#Write a dataframe in a columnar format
+def write_columnar(df, directory, table, file_format='parquet'):
+    """Save df as <directory>/<table>.parquet or .arrow (replacing the old file in a single rename)."""
+    pyarrow = _require_pyarrow()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, table + columnar_formats[file_format])
+    tmp_path = path + '.tmp'
+    arrow_table = pyarrow.Table.from_pandas(df, preserve_index=False)
+    if file_format == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(arrow_table, tmp_path)
+    else:
+        import pyarrow.ipc
+        with pyarrow.OSFile(tmp_path, 'wb') as sink, pyarrow.ipc.new_file(sink, arrow_table.schema) as writer:
+            writer.write_table(arrow_table)
+    os.replace(tmp_path, path)
+
+
+#Pick the backend the dashboard reads through
+def get_storage():
+    """SQLite by default; set MLB_STORAGE=parquet or arrow (and optionally MLB_COLUMNAR_DIR) to read the columnar copies."""
+    backend = os.environ.get('MLB_STORAGE', 'sqlite').lower()
+    if backend == 'sqlite':
+        return SQLiteStorage(os.environ.get('MLB_DB', mlb_db))
+    if backend in columnar_formats:
+        return ColumnarStorage(os.environ.get('MLB_COLUMNAR_DIR', columnar_dir), backend)
+    raise ValueError(f"Unknown MLB_STORAGE '{backend}' (expected sqlite, parquet or arrow)")
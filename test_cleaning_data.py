@@ -0,0 +1,61 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cleaning_data
+
+#Every raw csv the scrapers saved
+raw_files = sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'csv', '**', '*.csv'), recursive=True))
+
+
+#Does every value of the sample contain a digit? (original character-by-character version)
+def _looks_numeric_loop(sample):
+    return all(any(char.isdigit() for char in val) for val in sample)
+
+
+#Fill missing ranks with the rank above + 1 (original row-by-row version)
+def _fill_ranks_loop(ranks):
+    #Start off with a fixed ranked empty list and don't determine a last rank at the beginning
+    fixed_ranks = []
+    last_rank = None
+
+    #For the values in the rank column of the dataframe (Iterate)
+    for val in ranks:
+        #If the value we are currently iterating on is not NaN
+        if not np.isnan(val):
+            #If not, convert the current value into the 'last' valid rank
+            last_rank = int(val)
+            #Add the valid rank to the list of fixed ranks
+            fixed_ranks.append(last_rank)
+        else:
+            #If the last_rank recorded is NaN BUT we have a recorded last_rank
+            if last_rank is not None:
+                #Add 1 to the current last_rank
+                last_rank += 1
+                #Append the new last rank onto the fixed ranks
+                fixed_ranks.append(last_rank)
+            else:
+                #If the first ranked value is missing, keep it as NaN
+                fixed_ranks.append(np.nan)
+    return fixed_ranks
+
+
+#The vectorized cleaning has to write exactly the csv the original loops did
+@pytest.mark.parametrize('file_path', raw_files, ids=lambda path: os.path.relpath(path, os.path.dirname(os.path.abspath(__file__))))
+def test_vectorized_cleaning_matches_loop(file_path, monkeypatch):
+    df = pd.read_csv(file_path)
+    vectorized = cleaning_data.clean_dataframe(df).to_csv(index=False)
+
+    monkeypatch.setattr(cleaning_data, '_looks_numeric', _looks_numeric_loop)
+    monkeypatch.setattr(cleaning_data, '_fill_ranks', _fill_ranks_loop)
+    loop = cleaning_data.clean_dataframe(df).to_csv(index=False)
+
+    #Point at the first differing line rather than diffing the whole file
+    vectorized, loop = vectorized.splitlines(), loop.splitlines()
+    differing = [n for n, (a, b) in enumerate(zip(vectorized, loop), 1) if a != b]
+    assert len(vectorized) == len(loop), f"{len(vectorized)} lines vectorized, {len(loop)} with the loops"
+    assert not differing, (f"{len(differing)} line(s) differ, the first is line {differing[0]}: "
+                           f"{vectorized[differing[0] - 1]!r} != {loop[differing[0] - 1]!r}")